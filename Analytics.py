@@ -0,0 +1,310 @@
+import math
+from datetime import date
+
+from Ledger import TYPE_EXPENSE, TYPE_INCOME
+
+# Aggregates for the statistics and search tabs.
+# Date-range questions are answered from a rollup of totals per day and per
+# month (RollupCube). Full scans of the ledger's columns are used to build
+# the rollup and to verify it; with NumPy the columns are mirrored into
+# arrays (kept up to date on every change) and grouped with bincount, so
+# there is no Python work per row.
+
+
+# NumPy is optional (aggregates fall back to plain loops) and only imported
+# by the first scan, so it does not slow down startup
+np = None
+_numpy_checked = False
+
+
+def _load_numpy():
+    """Import NumPy on first use, None when it is not installed"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+def top_categories(totals, n=5, other="Khác"):
+    """Keep the n largest categories and fold the rest into `other`"""
+    ranked = sorted(totals.items(), key=lambda x: x[1], reverse=True)
+    top = dict(ranked[:n])
+    others_sum = sum(v for _, v in ranked[n:])
+    if others_sum > 0:
+        top[other] = top.get(other, 0) + others_sum
+    return top
+
+
+def _month_of(day):
+    """Month number (year * 12 + month - 1) of a day ordinal"""
+    d = date.fromordinal(day)
+    return d.year * 12 + d.month - 1
+
+
+def _month_bounds(month):
+    """First and last day ordinal of a month number"""
+    year, index = divmod(month, 12)
+    first = date(year, index + 1, 1).toordinal()
+    next_first = date(year + (index == 11), (index + 1) % 12 + 1, 1).toordinal()
+    return first, next_first - 1
+
+
+def _merge(groups, cells):
+    for key, (total, count) in cells.items():
+        old_total, old_count = groups.get(key, (0.0, 0))
+        groups[key] = (old_total + total, old_count + count)
+
+
+class RollupCube:
+    """Amount and count per (category, type) for every day and every month
+
+    A date range is answered from the monthly cells of the months it fully
+    covers plus the daily cells of the partial months at its edges, so the
+    cost depends on the number of months, not of transactions.
+    """
+    def __init__(self):
+        # day ordinal / month number -> {(category, type_code): [total, count]}
+        self._days = {}
+        self._months = {}
+
+    def _add_cell(self, table, period, key, amount, count):
+        cells = table.setdefault(period, {})
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = [amount, count]
+            return
+        cell[0] += amount
+        cell[1] += count
+        if cell[1] == 0:
+            # Drop empty cells instead of keeping rounding residue around
+            del cells[key]
+            if not cells:
+                del table[period]
+
+    def add(self, day, type_code, category, amount, sign=1):
+        """Add (sign=1) or remove (sign=-1) one transaction"""
+        key = (category, type_code)
+        self._add_cell(self._days, day, key, sign * amount, sign)
+        self._add_cell(self._months, _month_of(day), key, sign * amount, sign)
+
+    def add_cells(self, cells):
+        """Bulk add {(day, category, type_code): (total, count)}"""
+        for (day, category, type_code), (total, count) in cells.items():
+            key = (category, type_code)
+            self._add_cell(self._days, day, key, total, count)
+            self._add_cell(self._months, _month_of(day), key, total, count)
+
+    def query(self, start_day=None, end_day=None):
+        """{(category, type_code): (total, count)} for a day range (None = all)"""
+        groups = {}
+        if start_day is None or end_day is None:
+            for cells in self._months.values():
+                _merge(groups, cells)
+            return groups
+        if start_day > end_day:
+            return groups
+        for month in range(_month_of(start_day), _month_of(end_day) + 1):
+            if month not in self._months:
+                continue
+            first, last = _month_bounds(month)
+            if start_day <= first and last <= end_day:
+                _merge(groups, self._months[month])
+                continue
+            for day in range(max(start_day, first), min(end_day, last) + 1):
+                cells = self._days.get(day)
+                if cells:
+                    _merge(groups, cells)
+        return groups
+
+
+class AnalyticsEngine:
+    """Category breakdowns and income/expense totals over a ColumnarLedger
+
+    Register on_change() as a TransactionManager listener and call
+    adjust() for every transaction added or removed. Queries are answered
+    from a RollupCube built with one scan on first use. For the scans,
+    appends are copied into the NumPy mirror and updates patched in place;
+    deletes and reloads (which move or replace rows) trigger one memcpy
+    resync on the next scan.
+    """
+    _MIRRORED = ("days", "amounts", "types", "categories")
+
+    def __init__(self, ledger_source):
+        self._ledger_source = ledger_source
+        self._arrays = {}
+        self._size = 0
+        self._stale = True
+        self._rollups = None
+        # Bumped on every change, so callers can cache results per version
+        self.version = 0
+
+    @property
+    def vectorized(self):
+        return _load_numpy() is not None
+
+    def on_change(self, kind, transaction_ids):
+        """Manager listener: keep the mirror in step with the ledger"""
+        self.version += 1
+        if kind == "reload":
+            self._rollups = None
+        if np is None or self._stale:
+            return
+        ledger = self._ledger_source()
+        if kind == "add" and len(ledger) == self._size + len(transaction_ids):
+            self._append_tail(ledger)
+        elif kind == "update":
+            self._update_rows(ledger, transaction_ids)
+        else:
+            self._stale = True
+
+    def _resync(self, ledger):
+        """Copy every column of the ledger into fresh arrays"""
+        columns = ledger.columns()
+        size = len(ledger)
+        capacity = max(1024, size + size // 2)
+        self._arrays = {}
+        for name in self._MIRRORED:
+            column = columns[name]
+            mirror = np.empty(capacity, dtype=column.typecode)
+            mirror[:size] = np.frombuffer(column, dtype=column.typecode)
+            self._arrays[name] = mirror
+        self._size = size
+        self._stale = False
+
+    def _append_tail(self, ledger):
+        size = len(ledger)
+        columns = ledger.columns()
+        for name in self._MIRRORED:
+            mirror = self._arrays[name]
+            if size > len(mirror):
+                grown = np.empty(size + size // 2, dtype=mirror.dtype)
+                grown[:self._size] = mirror[:self._size]
+                self._arrays[name] = mirror = grown
+            column = columns[name]
+            mirror[self._size:size] = np.frombuffer(column, dtype=column.typecode)[self._size:]
+        self._size = size
+
+    def _update_rows(self, ledger, transaction_ids):
+        columns = ledger.columns()
+        for transaction_id in transaction_ids:
+            row = ledger.row_of(transaction_id)
+            if row < 0 or row >= self._size:
+                self._stale = True
+                return
+            for name in self._MIRRORED:
+                self._arrays[name][row] = columns[name][row]
+
+    def adjust(self, day, type_code, category, amount, sign=1):
+        """Add (sign=1) or remove (sign=-1) a transaction from the rollups"""
+        if self._rollups is not None:
+            self._rollups.add(day, type_code, category, amount, sign)
+
+    def _scan(self, start_day=None, end_day=None, by_day=False):
+        """Group the ledger columns by (category code, type code), plus day with by_day
+
+        Returns {(category code, type code[, day]): (total, count)}.
+        """
+        ranged = start_day is not None and end_day is not None
+        if _load_numpy() is None:
+            groups = {}
+            columns = self._ledger_source().columns()
+            for day, amount, type_, category in zip(columns["days"], columns["amounts"],
+                                                    columns["types"], columns["categories"]):
+                if ranged and not start_day <= day <= end_day:
+                    continue
+                key = (category, type_, day) if by_day else (category, type_)
+                total, count = groups.get(key, (0.0, 0))
+                groups[key] = (total + amount, count + 1)
+            return groups
+
+        ledger = self._ledger_source()
+        if self._stale or self._size != len(ledger):
+            self._resync(ledger)
+        days, amounts, types, categories = (self._arrays[name][:self._size] for name in self._MIRRORED)
+        # One bincount over (category, type) keys; rows outside the range get
+        # zero weight instead of being filtered out (no fancy indexing)
+        keys = categories.astype(np.intp) * 2 + types
+        length = 2 * len(ledger.category_table)
+        if by_day:
+            if not len(days):
+                return {}
+            first_day = int(days.min())
+            keys += (days - first_day).astype(np.intp) * length
+            cells, inverse = np.unique(keys, return_inverse=True)
+            sums = np.bincount(inverse, weights=amounts)
+            counts = np.bincount(inverse)
+            return {(int(key) % length // 2, int(key) % 2, int(key) // length + first_day):
+                    (float(total), int(count)) for key, total, count in zip(cells, sums, counts)}
+        if ranged:
+            mask = (days >= start_day) & (days <= end_day)
+            sums = np.bincount(keys, weights=np.where(mask, amounts, 0.0), minlength=length)
+            counts = np.bincount(keys, weights=mask, minlength=length)
+        else:
+            sums = np.bincount(keys, weights=amounts, minlength=length)
+            counts = np.bincount(keys, minlength=length)
+        return {(int(key) // 2, int(key) % 2): (float(sums[key]), int(counts[key]))
+                for key in np.flatnonzero(counts)}
+
+    def _grouped(self, start_day, end_day):
+        """{(category, type code): (total, count)} for a day range, from the rollups"""
+        if self._rollups is None:
+            table = self._ledger_source().category_table
+            rollups = RollupCube()
+            rollups.add_cells({(day, table[category], type_): cell
+                               for (category, type_, day), cell in self._scan(by_day=True).items()})
+            self._rollups = rollups
+        return self._rollups.query(start_day, end_day)
+
+    def verify_rollups(self, start_day=None, end_day=None):
+        """Check the rollups against a full scan, raises AssertionError on a mismatch"""
+        table = self._ledger_source().category_table
+        expected = {(table[category], type_): cell
+                    for (category, type_), cell in self._scan(start_day, end_day).items()}
+        actual = self._grouped(start_day, end_day)
+        if set(actual) != set(expected):
+            raise AssertionError(f"Rollup groups {sorted(actual)} differ from {sorted(expected)}")
+        for key, (total, count) in expected.items():
+            if actual[key][1] != count or not math.isclose(actual[key][0], total, rel_tol=1e-9, abs_tol=1e-6):
+                raise AssertionError(f"Rollup {key} is {actual[key]}, expected {(total, count)}")
+        return True
+
+    def category_totals(self, start_day=None, end_day=None, type_code=TYPE_EXPENSE):
+        """Total amount per category name for a day range and type"""
+        totals = {}
+        for (category, type_), (total, _) in self._grouped(start_day, end_day).items():
+            if type_code is None or type_ == type_code:
+                totals[category] = totals.get(category, 0) + total
+        return totals
+
+    def totals(self, start_day=None, end_day=None, type_code=None):
+        """Income, expense, balance and count for a day range (and type)"""
+        income = expense = 0.0
+        count = 0
+        for (_, type_), (total, type_count) in self._grouped(start_day, end_day).items():
+            if type_code is not None and type_ != type_code:
+                continue
+            if type_ == TYPE_INCOME:
+                income += total
+            else:
+                expense += total
+            count += type_count
+        return {"income": income, "expense": expense, "balance": income - expense, "count": count}
+
+    def stats(self, start_day=None, end_day=None, top_n=5):
+        """Data for the statistics tab: top expense categories and totals"""
+        expense_by_category = {}
+        totals = [0.0, 0.0]
+        for (category, type_), (total, _) in self._grouped(start_day, end_day).items():
+            totals[type_] += total
+            if type_ == TYPE_EXPENSE:
+                expense_by_category[category] = expense_by_category.get(category, 0) + total
+        return {
+            "expense_by_category": top_categories(expense_by_category, top_n),
+            "total_income": totals[TYPE_INCOME],
+            "total_expense": totals[TYPE_EXPENSE]
+        }
@@ -0,0 +1,316 @@
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from Core import TransactionManager
+from Storage import JsonStorage
+
+# Benchmarks for the data layer on deterministic synthetic ledgers, e.g.
+#   python Benchmark.py --sizes 10000 100000 1000000 --output bench.json
+#   python Benchmark.py --sizes 100000 --compare bench.json
+# Each operation is timed (best of --repeat runs) and then run once more
+# under tracemalloc for its peak memory. Results are written as JSON; with
+# --compare, operations slower than the previous run by more than
+# --threshold (and by at least --noise-floor-ms) are reported and the exit
+# status is 1.
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+
+# (category, weight, median amount in VND, descriptions)
+EXPENSE_PROFILE = [
+    ("Ăn uống", 40, 45000, ["Cơm trưa", "Mua bánh mì ăn sáng", "Cà phê với bạn", "Trà sữa", "Ăn tối cùng gia đình"]),
+    ("Đi lại", 18, 30000, ["Tiền xe bus lên trường", "Đổ xăng", "Gọi xe công nghệ", "Gửi xe"]),
+    ("Mua sắm", 15, 350000, ["Mua quần áo", "Mua đồ dùng học tập", "Siêu thị cuối tuần", "Mua sắm online"]),
+    ("Giải trí", 10, 150000, ["Xem phim", "Đi chơi cuối tuần", "Mua sách", "Karaoke"]),
+    ("Hóa đơn", 10, 600000, ["Tiền điện", "Tiền nước", "Internet", "Tiền điện thoại", "Tiền nhà"]),
+    ("Khác", 7, 100000, ["Quà sinh nhật", "Chi phí khác", "Sửa xe"])
+]
+INCOME_PROFILE = [
+    ("Lương", 55, 9000000, ["Lương tháng", "Lương làm thêm"]),
+    ("Thưởng", 15, 1500000, ["Thưởng dự án", "Thưởng Tết", "Học bổng"]),
+    ("Đầu tư", 15, 800000, ["Lãi tiết kiệm", "Cổ tức"]),
+    ("Khác", 15, 300000, ["Bán đồ cũ", "Được cho tiền"])
+]
+INCOME_SHARE = 0.1
+
+
+def generate_transactions(count, seed=0, start=date(2022, 1, 1), days=3 * 365):
+    """Deterministic synthetic transactions (TransactionModel.to_dict() records)
+
+    About INCOME_SHARE of the rows are income; categories follow the
+    weights above with log-normal amounts around each median. Dates are in
+    entry order over `days` days, with a few percent back-dated by up to a
+    month, and some weekday spending is moved to the weekend.
+    """
+    rng = random.Random(seed)
+    expense_weights = [weight for _, weight, _, _ in EXPENSE_PROFILE]
+    income_weights = [weight for _, weight, _, _ in INCOME_PROFILE]
+    first_day = start.toordinal()
+    records = []
+    for i in range(count):
+        day = first_day + min(days - 1, int(days * (i + rng.random()) / count))
+        if rng.random() < 0.03:
+            day -= rng.randint(1, 30)
+        income = rng.random() < INCOME_SHARE
+        weekday = date.fromordinal(day).weekday()
+        if not income and weekday < 5 and rng.random() < 0.15:
+            day += 5 - weekday + rng.randint(0, 1)
+        profile = INCOME_PROFILE if income else EXPENSE_PROFILE
+        category, _, median, descriptions = rng.choices(
+            profile, weights=income_weights if income else expense_weights)[0]
+        amount = max(1000, round(median * math.exp(rng.gauss(0, 0.6)), -3))
+        records.append({
+            "id": i + 1,
+            "date": date.fromordinal(day).isoformat(),
+            "description": rng.choice(descriptions),
+            "amount": float(amount),
+            "type": "income" if income else "expense",
+            "category": category
+        })
+    return records
+
+
+class _HeadlessTree:
+    """Stands in for ttk.Treeview/Scrollbar when there is no display"""
+    def __init__(self):
+        self._items = {}
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def config(self, **kwargs):
+        pass
+
+    def set(self, first, last):
+        pass
+
+    def get_children(self):
+        return tuple(self._items)
+
+    def insert(self, parent, index, iid):
+        self._items[iid] = ()
+
+    def delete(self, iid):
+        del self._items[iid]
+
+    def item(self, iid, values=None):
+        self._items[iid] = values
+
+    def selection(self):
+        return ()
+
+    def selection_set(self, items):
+        pass
+
+
+def _treeview(root):
+    """(tree, scrollbar, backend name) for the list view benchmark"""
+    if root is not None:
+        from tkinter import ttk
+        columns = ("ID", "Ngày", "Mô tả", "Số tiền", "Loại", "Danh mục")
+        return ttk.Treeview(root, columns=columns, show="headings"), ttk.Scrollbar(root), "tk"
+    tree = _HeadlessTree()
+    return tree, tree, "headless"
+
+
+def _open_tk():
+    """A hidden Tk root, or None without a display"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        return root
+    except Exception:
+        return None
+
+
+def _measure(func, repeat, memory):
+    """Best wall time of `repeat` runs, then peak traced memory of one more"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak, result
+
+
+def run_size(size, workdir, repeat=3, memory=True, seed=0, tk_root=None):
+    """Time every operation on a synthetic ledger of `size` rows"""
+    results = {}
+
+    def record(name, func, rows=size, runs=repeat, trace=True):
+        seconds, peak, result = _measure(func, runs, memory and trace)
+        entry = {"seconds": seconds, "rows": rows,
+                 "rows_per_second": rows / seconds if seconds > 0 else None,
+                 "peak_memory_bytes": peak}
+        if type(result) is int:
+            entry["result_count"] = result
+        results[name] = entry
+        peak_text = f"{peak / 2**20:8.1f} MiB" if peak is not None else ""
+        print(f"  {name:<24} {seconds * 1000:10.2f} ms {entry['rows_per_second'] or 0:14,.0f} rows/s {peak_text}",
+              flush=True)
+        return result
+
+    print(f"{size:,} rows", flush=True)
+    records = record("generate", lambda: generate_transactions(size, seed), runs=1)
+    filename = os.path.join(workdir, f"ledger_{size}.json")
+    JsonStorage(filename, binary_snapshot=False).save_all(records)
+    first_day = date.fromisoformat(min(r["date"] for r in records))
+    last_day = date.fromisoformat(max(r["date"] for r in records))
+    del records
+
+    def load(binary):
+        manager = TransactionManager(storage=JsonStorage(filename, binary_snapshot=binary), load=False)
+        manager.load_transactions(raise_errors=True)
+        return manager
+
+    record("load_transactions_json", lambda: load(False).get_summary()["count"], runs=1)
+    manager = load(False)
+    record("save_transactions", manager.save_transactions)
+    # The first binary-enabled load parses the JSON and writes the binary
+    # snapshot; only the loads after it are timed
+    load(True).close()
+    record("load_transactions_binary", lambda: load(True).get_summary()["count"])
+    manager = load(True)
+
+    # A month and a year in the middle of the ledger
+    middle = first_day + (last_day - first_day) / 2
+    month_start = middle.replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    year_start, year_end = middle - timedelta(days=182), middle + timedelta(days=182)
+    month = (month_start.isoformat(), month_end.isoformat())
+    year = (year_start.isoformat(), year_end.isoformat())
+    everything = (first_day.isoformat(), last_day.isoformat())
+
+    # First calls build the rollups / text index (a second run would not, so no memory pass)
+    record("get_stats_cold", lambda: manager.get_stats(*everything), runs=1, trace=False)
+    record("filter_text_cold", lambda: len(manager.filter_transactions(text="cơm")), runs=1, trace=False)
+
+    record("get_summary", lambda: manager.get_summary()["count"])
+    record("get_range_summary_year", lambda: manager.get_range_summary(*year)["count"])
+    record("get_stats_all", lambda: manager.get_stats(*everything))
+    record("get_stats_month", lambda: manager.get_stats(*month))
+    record("filter_month", lambda: len(manager.filter_transactions(*month)))
+    record("filter_year_expense", lambda: len(manager.filter_transactions(*year, "expense")))
+    record("filter_text", lambda: len(manager.filter_transactions(text="cơm")))
+    record("filter_text_month", lambda: len(manager.filter_transactions(*month, text="tiền")))
+
+    try:
+        from VirtualTree import VirtualTreeview, transaction_row_values
+    except Exception as e:
+        print(f"  treeview skipped: {e}")
+        results["treeview_refresh"] = {"skipped": str(e)}
+    else:
+        tree, scrollbar, backend = _treeview(tk_root)
+        virtual = VirtualTreeview(tree, scrollbar, transaction_row_values)
+
+        def refresh_list():
+            # What TransactionListView.update_view does, then scroll to the middle and the end
+            virtual.set_rows(manager.sorted_transactions())
+            virtual.yview("moveto", 0.5)
+            virtual.yview("moveto", 1.0)
+            if tk_root is not None:
+                tk_root.update_idletasks()
+        record("treeview_refresh", refresh_list)
+        results["treeview_refresh"]["backend"] = backend
+    manager.close()
+    return results
+
+
+def compare(current, previous, threshold, noise_floor=0.001):
+    """Operations at least `threshold` times and `noise_floor` seconds slower than in previous"""
+    regressions = []
+    for size, operations in current["results"].items():
+        for name, entry in operations.items():
+            old = previous.get("results", {}).get(size, {}).get(name)
+            if not old or "seconds" not in entry or not old.get("seconds"):
+                continue
+            if entry["seconds"] - old["seconds"] < noise_floor:
+                # Sub-millisecond timings jitter by large ratios
+                continue
+            ratio = entry["seconds"] / old["seconds"]
+            if ratio >= threshold:
+                regressions.append((size, name, old["seconds"], entry["seconds"], ratio))
+    return regressions
+
+
+def _metadata(args):
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "numpy": numpy_version,
+        "seed": args.seed,
+        "repeat": args.repeat
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo hiệu năng lớp dữ liệu trên sổ giao dịch tổng hợp")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3, help="số lần chạy mỗi thao tác (lấy lần nhanh nhất)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="không đo bộ nhớ đỉnh (tracemalloc)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="kết quả JSON của lần chạy trước")
+    parser.add_argument("--threshold", type=float, default=1.25, help="tỉ lệ chậm hơn bị coi là hồi quy")
+    parser.add_argument("--noise-floor-ms", type=float, default=1.0,
+                        help="bỏ qua thay đổi nhỏ hơn số mili giây này")
+    args = parser.parse_args(argv)
+
+    tk_root = _open_tk()
+    workdir = tempfile.mkdtemp(prefix="qlct_bench_")
+    output = {"meta": _metadata(args), "results": {}}
+    try:
+        for size in args.sizes:
+            output["results"][str(size)] = run_size(size, workdir, args.repeat, not args.no_memory,
+                                                    args.seed, tk_root)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if tk_root is not None:
+            tk_root.destroy()
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(output, file, indent=4, ensure_ascii=False)
+    print(f"Kết quả đã lưu vào {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            previous = json.load(file)
+        regressions = compare(output, previous, args.threshold, args.noise_floor_ms / 1000)
+        for size, name, old, new, ratio in regressions:
+            print(f"HỒI QUY {int(size):,} rows {name}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"Không có thao tác nào chậm hơn {args.threshold:.2f}x so với {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import argparse
+import os
+import sys
+from Core import TransactionModel, TransactionManager
+from Ledger import date_to_ordinal
+from ImportExport import iter_csv_records, iter_json_records, normalize_record, write_csv, write_json
+from Storage import JsonStorage, SqliteStorage, create_storage, migrate_shared_transactions
+from UserStore import get_user_store
+
+# Command-line reports over a ledger without the GUI, e.g.
+#   python Cli.py --user alice summary --from 2024-01-01 --to 2024-12-31
+#   python Cli.py --ledger transactions.json filter --type expense --text "an trua"
+#   python Cli.py --ledger transactions.json export thang1.csv --from 2024-01-01 --to 2024-01-31
+#   python Cli.py --user alice import sao_ke.csv
+
+
+def open_manager(args):
+    """TransactionManager over --ledger (a .json or .db file) or --user's partition
+
+    Like the login screen, a --user run first splits a not yet migrated
+    shared ledger into the per-user partitions. Reports (args.read_only)
+    never write to the ledger itself.
+    """
+    if args.ledger:
+        if args.ledger.lower().endswith(".db"):
+            storage = SqliteStorage(args.ledger, migrate_from=None)
+        else:
+            storage = JsonStorage(args.ledger, binary_snapshot=os.environ.get("QLCT_BINARY_SNAPSHOT", "1") != "0")
+    else:
+        migrate_shared_transactions(get_user_store().usernames())
+        storage = create_storage(async_writes=False, username=args.user)
+    return TransactionManager(storage=storage, read_only=args.read_only)
+
+
+def _date_argument(value):
+    """argparse type for --from/--to, parsed like the ledger's date lookups"""
+    try:
+        date_to_ordinal(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ngày không hợp lệ '{value}' (cần dạng YYYY-MM-DD)")
+    return value
+
+
+def _criteria(args):
+    return {
+        "start_date": args.from_date,
+        "end_date": args.to_date,
+        "transaction_type": None if args.type == "all" else args.type
+    }
+
+
+def _print_summary(summary):
+    print(f"Tổng thu nhập: {summary['income']:,.0f} VND")
+    print(f"Tổng chi tiêu: {summary['expense']:,.0f} VND")
+    print(f"Số dư:         {summary['balance']:,.0f} VND")
+    print(f"Số giao dịch:  {summary['count']:,}")
+
+
+def run_summary(manager, args):
+    criteria = _criteria(args)
+    _print_summary(manager.get_range_summary(**criteria))
+    for type_name, title in (("income", "Thu nhập"), ("expense", "Chi tiêu")):
+        if criteria["transaction_type"] not in (None, type_name):
+            continue
+        totals = manager.get_category_totals(criteria["start_date"], criteria["end_date"], type_name)
+        if totals:
+            print(f"\n{title} theo danh mục:")
+            for category, amount in sorted(totals.items(), key=lambda x: x[1], reverse=True):
+                print(f"  {category:<20} {amount:>18,.0f}")
+    return 0
+
+
+def run_filter(manager, args):
+    ids = manager.select_transaction_ids(category=args.category, text=args.text, **_criteria(args))
+    if args.limit is not None:
+        ids = ids[:args.limit]
+    chunks = manager.iter_transaction_chunks(ids)
+    if args.format == "csv":
+        write_csv(chunks, sys.stdout)
+    elif args.format == "json":
+        write_json(chunks, sys.stdout)
+        print()
+    else:
+        for chunk in chunks:
+            sys.stdout.write("".join(f"{t.id}\t{t.date}\t{t.get_display_type()}\t{t.category}\t"
+                                     f"{t.amount:,.0f}\t{t.description}\n" for t in chunk))
+        print(f"{len(ids):,} giao dịch", file=sys.stderr)
+    return 0
+
+
+def run_export(manager, args):
+    criteria = dict(_criteria(args), category=args.category, text=args.text)
+    if args.file.lower().endswith(".json"):
+        manager.export_to_json(args.file, **criteria)
+    else:
+        manager.export_to_csv(args.file, **criteria)
+    print(f"Đã xuất dữ liệu ra {args.file}")
+    return 0
+
+
+def run_import(manager, args, batch_size=5000):
+    read_records = iter_json_records if args.file.lower().endswith(".json") else iter_csv_records
+    imported = invalid = 0
+    batch = []
+    with open(args.file, "rb") as file:
+        for raw in read_records(file):
+            try:
+                batch.append(TransactionModel.from_dict(normalize_record(raw), raise_errors=True))
+            except (ValueError, TypeError, AttributeError):
+                invalid += 1
+                continue
+            if len(batch) >= batch_size:
+                imported += manager.add_transactions(batch, compact=False)
+                batch = []
+    if batch:
+        imported += manager.add_transactions(batch, compact=False)
+    # Fold the import's journal entries into the snapshot once
+    manager.save_transactions()
+    print(f"Đã nhập {imported:,} giao dịch, bỏ qua {invalid:,} dòng không hợp lệ.")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Báo cáo thu nhập/chi tiêu không cần giao diện")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--ledger", help="tệp giao dịch (.json hoặc .db)")
+    source.add_argument("--user", help="dùng dữ liệu của người dùng này (user_data/<tên>/)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_criteria(command, category=True):
+        command.add_argument("--from", dest="from_date", type=_date_argument, help="từ ngày (YYYY-MM-DD)")
+        command.add_argument("--to", dest="to_date", type=_date_argument, help="đến ngày (YYYY-MM-DD)")
+        command.add_argument("--type", choices=["all", "income", "expense"], default="all")
+        if category:
+            command.add_argument("--category", help="chỉ một danh mục")
+            command.add_argument("--text", help="từ khóa trong mô tả/danh mục")
+
+    summary = commands.add_parser("summary", help="tổng thu/chi và theo danh mục")
+    add_criteria(summary, category=False)
+    summary.set_defaults(run=run_summary, read_only=True)
+
+    filter_command = commands.add_parser("filter", help="liệt kê giao dịch theo điều kiện")
+    add_criteria(filter_command)
+    filter_command.add_argument("--limit", type=int)
+    filter_command.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    filter_command.set_defaults(run=run_filter, read_only=True)
+
+    export = commands.add_parser("export", help="xuất giao dịch ra tệp CSV/JSON")
+    export.add_argument("file")
+    add_criteria(export)
+    export.set_defaults(run=run_export, read_only=True)
+
+    import_command = commands.add_parser("import", help="nhập giao dịch từ tệp CSV/JSON")
+    import_command.add_argument("file")
+    import_command.set_defaults(run=run_import, read_only=False)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.user is not None and args.user not in get_user_store():
+        parser.error(f"không có người dùng '{args.user}' trong {get_user_store().filename}")
+    if bool(getattr(args, "from_date", None)) != bool(getattr(args, "to_date", None)):
+        parser.error("cần cả --from và --to")
+    try:
+        manager = open_manager(args)
+    except Exception as e:
+        print(f"Lỗi: Không thể đọc dữ liệu: {e}", file=sys.stderr)
+        return 1
+    try:
+        return args.run(manager, args)
+    except (OSError, ValueError) as e:
+        print(f"Lỗi: {e}", file=sys.stderr)
+        return 1
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,651 @@
+import math
+import os
+import struct
+import threading
+from abc import abstractmethod
+from datetime import datetime
+from Storage import create_storage
+from Ledger import ColumnarLedger, DateOrderedRows, TYPE_CODES, date_to_ordinal
+from ImportExport import ExportJob, write_csv, write_json
+from Analytics import AnalyticsEngine
+from SearchIndex import TextIndex
+from Profiling import timed
+
+# GUI-free data layer: the transaction models and TransactionManager.
+# Nothing here imports tkinter, so it can run in scripts, batch jobs and
+# benchmarks (see Cli.py); Gui.py builds the views on top of it.
+
+class TransactionModel:
+    """Base model class for managing transaction data"""
+    def __init__(self, id, date, description, amount, category=None):
+        self._id = int(id)  # Ensure ID is an integer
+        try:
+            # Validate and standardize date format
+            self._date = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except (ValueError, TypeError):
+            self._date = datetime.now().strftime("%Y-%m-%d")
+        self._description = description if description else ""
+        self._amount = float(amount) if amount else 0.0
+        self._category = category if category else "Khác"
+    
+    @property
+    def id(self):
+        return self._id
+        
+    @property
+    def date(self):
+        return self._date
+        
+    @date.setter
+    def date(self, value):
+        try:
+            self._date = datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except (ValueError, TypeError):
+            self._date = datetime.now().strftime("%Y-%m-%d")
+        
+    @property
+    def description(self):
+        return self._description
+        
+    @description.setter
+    def description(self, value):
+        self._description = value if value else ""
+        
+    @property
+    def amount(self):
+        return self._amount
+        
+    @amount.setter
+    def amount(self, value):
+        self._amount = float(value) if value else 0.0
+        
+    @property
+    def category(self):
+        return self._category
+        
+    @category.setter
+    def category(self, value):
+        self._category = value if value else "Khác"
+    
+    @abstractmethod
+    def get_type(self):
+        """Return the transaction type"""
+        pass
+    
+    def get_display_type(self):
+        """Return display-friendly transaction type"""
+        return "Thu nhập" if self.get_type() == "income" else "Chi tiêu"
+    
+    def to_dict(self):
+        """Convert transaction to dictionary"""
+        return {
+            "id": self._id,
+            "date": self._date,
+            "description": self._description,
+            "amount": self._amount,
+            "type": self.get_type(),
+            "category": self._category
+        }
+    
+    @classmethod
+    def from_dict(cls, data, raise_errors=False):
+        """Create a transaction from dictionary (raise_errors: raise instead of returning None)"""
+        try:
+            if data.get("type") == "income":
+                return IncomeTransaction(
+                    data.get("id", 1), 
+                    data.get("date", datetime.now().strftime("%Y-%m-%d")), 
+                    data.get("description", ""), 
+                    data.get("amount", 0.0), 
+                    data.get("category", "Khác")
+                )
+            else:
+                return ExpenseTransaction(
+                    data.get("id", 1), 
+                    data.get("date", datetime.now().strftime("%Y-%m-%d")), 
+                    data.get("description", ""), 
+                    data.get("amount", 0.0), 
+                    data.get("category", "Khác")
+                )
+        except Exception:
+            if raise_errors:
+                raise
+            return None
+
+class IncomeTransaction(TransactionModel):
+    """Model for income transactions"""
+    def get_type(self):
+        return "income"
+
+class ExpenseTransaction(TransactionModel):
+    """Model for expense transactions"""
+    def get_type(self):
+        return "expense"
+
+class TransactionManager:
+    """Manager class for handling transactions
+    
+    Failures (unreadable or unwritable storage, invalid dates) are passed to
+    error_handler(message, error) when one is set (the GUI shows them in a
+    message box); without a handler they are raised. error is None for
+    invalid input, which is raised as ValueError(message).
+    
+    A read_only manager never writes to its storage: loading does not
+    compact the journal, renumber repeated IDs or write a binary snapshot
+    (for reports that must leave the files untouched), and changes are only
+    kept in memory.
+    """
+    def __init__(self, storage=None, verify_totals=None, load=True, username=None, error_handler=None,
+                 read_only=False):
+        # Columnar store with id and date indexes, and the next id to hand out
+        self._ledger = ColumnarLedger()
+        self._next_id = 1
+        # Running totals adjusted by every mutation, so get_summary() is O(1)
+        self._totals = {"income": 0.0, "expense": 0.0, "count": 0}
+        self._verify_totals = (verify_totals if verify_totals is not None
+                               else os.environ.get("QLCT_VERIFY_TOTALS") == "1")
+        # Without an explicit storage, only the user's own partition is used
+        self._storage = storage if storage is not None else create_storage(username=username)
+        # Vectorized aggregates, kept in step with the ledger as a listener
+        self._analytics = AnalyticsEngine(lambda: self._ledger)
+        # Inverted index for text search, built on the first search
+        self._text_index = None
+        # Callbacks notified with (kind, transaction_ids) after every change
+        self._listeners = [self._analytics.on_change]
+        # Held while the ledger is mutated, so worker threads can read it in chunks
+        self._lock = threading.RLock()
+        self._income_categories = ["Lương", "Thưởng", "Đầu tư", "Khác"]
+        self._expense_categories = ["Ăn uống", "Đi lại", "Mua sắm", "Giải trí", "Hóa đơn", "Khác"]
+        self._error_handler = error_handler
+        self._read_only = read_only
+        if load:
+            self.load_transactions()
+    
+    @property
+    def transactions(self):
+        return list(self._ledger)
+    
+    @property
+    def storage(self):
+        return self._storage
+    
+    @property
+    def data_version(self):
+        """Counter bumped by every change, for caching derived views"""
+        return self._analytics.version
+    
+    @property
+    def income_categories(self):
+        return self._income_categories
+    
+    def set_error_handler(self, handler):
+        """Report failures to handler(message, error) instead of raising them"""
+        self._error_handler = handler
+    
+    def _report(self, message, error=None):
+        """Pass a failure to the error handler, or raise it when there is none"""
+        if self._error_handler is not None:
+            self._error_handler(message, error)
+        elif error is not None:
+            raise error
+        else:
+            raise ValueError(message)
+    
+    def add_listener(self, callback):
+        """Register callback(kind, transaction_ids), kind is add/update/delete/reload"""
+        self._listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        """Unregister a change callback"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _notify(self, kind, transaction_ids):
+        """Tell listeners what changed"""
+        for callback in list(self._listeners):
+            callback(kind, transaction_ids)
+    
+    @property
+    def expense_categories(self):
+        return self._expense_categories
+    
+    def _load_binary_snapshot(self):
+        """Load the ledger from an up-to-date binary snapshot, or return False"""
+        if not hasattr(self._storage, "load_binary"):
+            return False
+        try:
+            loaded = self._storage.load_binary(ColumnarLedger.from_snapshot)
+        except (OSError, ValueError, struct.error):
+            # Unreadable binary snapshot: fall back to the JSON
+            return False
+        if loaded is None:
+            return False
+        ledger, entries = loaded
+        # Replay the journal; it may repeat changes the snapshot already has
+        for entry in entries:
+            data = entry.get("data", {})
+            if entry.get("op") == "delete":
+                ledger.remove(int(data.get("id", 1)))
+                continue
+            t = TransactionModel.from_dict(data)
+            if t is None:
+                continue
+            if t.id in ledger:
+                ledger.update(*self._columns(t))
+            else:
+                ledger.append(*self._columns(t))
+        self._ledger = ledger
+        return True
+    
+    @timed("TransactionManager.load_transactions")
+    def load_transactions(self, raise_errors=False):
+        """Load transactions from the binary or JSON snapshot and replay the journal
+        
+        With raise_errors a failed load is raised even when an error handler
+        is set (for loading off the Tk thread).
+        """
+        self._text_index = None
+        if self._load_binary_snapshot():
+            self._next_id = max(self._ledger.max_id(), 0) + 1
+            self._totals = self._compute_totals()
+            if self._storage.needs_compaction():
+                self.save_transactions()
+            self._notify("reload", [])
+            return
+        
+        self._ledger = ColumnarLedger()
+        try:
+            data = self._storage.load()
+            duplicates = []
+            for t in (TransactionModel.from_dict(d) for d in data):
+                if t is None:
+                    continue
+                if t.id in self._ledger:
+                    duplicates.append(t)
+                else:
+                    self._ledger.append(*self._columns(t), index=False)
+            # A repeated ID (e.g. a hand-edited file) gets a new ID instead
+            # of being dropped; the snapshot is rewritten with it below
+            next_id = max(self._ledger.max_id(), 0) + 1
+            for t in duplicates:
+                self._ledger.append(next_id, *self._columns(t)[1:], index=False)
+                next_id += 1
+        except Exception as e:
+            self._ledger = ColumnarLedger()
+            self._next_id = 1
+            self._totals = self._compute_totals()
+            self._notify("reload", [])
+            if raise_errors:
+                raise
+            self._report("Không thể đọc dữ liệu", e)
+            return
+        self._ledger.rebuild_index()
+        self._next_id = max(self._ledger.max_id(), 0) + 1
+        self._totals = self._compute_totals()
+        if duplicates or self._storage.needs_compaction():
+            self.save_transactions()
+        elif hasattr(self._storage, "save_binary") and len(self._ledger) and not self._read_only:
+            # Make the next start load from the binary snapshot
+            self._storage.save_binary(self._ledger.to_snapshot())
+        self._notify("reload", [])
+    
+    @timed("TransactionManager.save_transactions")
+    def save_transactions(self):
+        """Save a full snapshot of transactions (compacts the journal)"""
+        if self._read_only:
+            return False
+        try:
+            self._storage.save_all([t.to_dict() for t in self._ledger])
+            if hasattr(self._storage, "save_binary"):
+                self._storage.save_binary(self._ledger.to_snapshot())
+            return True
+        except Exception as e:
+            self._report("Không thể lưu dữ liệu", e)
+            return False
+    
+    @staticmethod
+    def _columns(transaction):
+        """Split a transaction into the ledger's column values"""
+        return (
+            transaction.id,
+            date_to_ordinal(transaction.date),
+            transaction.amount,
+            TYPE_CODES[transaction.get_type()],
+            transaction.category,
+            transaction.description
+        )
+    
+    def _compute_totals(self):
+        """Compute income/expense/count totals from scratch"""
+        return self._ledger.totals()
+    
+    def _adjust_totals(self, transaction, sign, transaction_id=None):
+        """Add (sign=1) or remove (sign=-1) a transaction from the running totals, rollups and text index"""
+        self._totals[transaction.get_type()] += sign * transaction.amount
+        self._totals["count"] += sign
+        self._analytics.adjust(date_to_ordinal(transaction.date), TYPE_CODES[transaction.get_type()],
+                               transaction.category, transaction.amount, sign)
+        if self._text_index is not None:
+            transaction_id = transaction.id if transaction_id is None else transaction_id
+            if sign > 0:
+                self._text_index.add(transaction_id, transaction.description, transaction.category)
+            else:
+                self._text_index.remove(transaction_id, transaction.description, transaction.category)
+    
+    def verify_totals(self):
+        """Recompute totals from scratch and check the cached running totals"""
+        expected = self._compute_totals()
+        for key in ("income", "expense"):
+            if not math.isclose(self._totals[key], expected[key], rel_tol=1e-9, abs_tol=1e-6):
+                raise AssertionError(f"Running total '{key}' is {self._totals[key]}, expected {expected[key]}")
+        if self._totals["count"] != expected["count"]:
+            raise AssertionError(f"Running count is {self._totals['count']}, expected {expected['count']}")
+        return self._analytics.verify_rollups()
+    
+    @timed("TransactionManager.flush")
+    def flush(self):
+        """Wait until every pending write has reached the disk"""
+        self._storage.flush()
+    
+    @timed("TransactionManager.close")
+    def close(self):
+        """Flush pending writes and release the storage"""
+        self._storage.close()
+    
+    def _persist(self, op, data):
+        """Journal a single mutation, compacting when the journal grows too long"""
+        return self._persist_many([(op, data)])
+    
+    @timed("TransactionManager.persist_many")
+    def _persist_many(self, entries):
+        """Journal several mutations in one write"""
+        if self._read_only:
+            return False
+        try:
+            self._storage.append_many(entries)
+        except Exception as e:
+            self._report("Không thể lưu dữ liệu", e)
+            return False
+        if self._storage.needs_compaction():
+            return self.save_transactions()
+        return True
+    
+    def add_transaction(self, transaction):
+        """Add a new transaction"""
+        if transaction and transaction.id not in self._ledger:
+            with self._lock:
+                self._ledger.append(*self._columns(transaction))
+            self._adjust_totals(transaction, 1)
+            self._next_id = max(self._next_id, transaction.id + 1)
+            self._notify("add", [transaction.id])
+            return self._persist("add", transaction.to_dict())
+        return False
+    
+    @timed("TransactionManager.add_transactions")
+    def add_transactions(self, transactions, assign_ids=True, compact=True):
+        """Add many transactions with one index merge, one journal write and one notification
+        
+        With assign_ids the transactions get consecutive new IDs (their own
+        IDs are ignored). compact=False postpones journal compaction, e.g.
+        until a long import has finished. Returns the number added.
+        """
+        rows = []
+        entries = []
+        seen = set()
+        for t in transactions:
+            if t is None:
+                continue
+            columns = self._columns(t)
+            if assign_ids:
+                columns = (self._next_id,) + columns[1:]
+                self._next_id += 1
+            elif columns[0] in self._ledger or columns[0] in seen:
+                continue
+            else:
+                self._next_id = max(self._next_id, columns[0] + 1)
+            seen.add(columns[0])
+            rows.append(columns)
+            data = t.to_dict()
+            data["id"] = columns[0]
+            entries.append(("add", data))
+            self._adjust_totals(t, 1, columns[0])
+        if not rows:
+            return 0
+        with self._lock:
+            self._ledger.extend(rows)
+        self._notify("add", [row[0] for row in rows])
+        if self._read_only:
+            return len(rows)
+        try:
+            self._storage.append_many(entries)
+        except Exception as e:
+            self._report("Không thể lưu dữ liệu", e)
+            return 0
+        if compact and self._storage.needs_compaction():
+            self.save_transactions()
+        return len(rows)
+    
+    def update_transaction(self, transaction):
+        """Update an existing transaction"""
+        if transaction:
+            old = self._ledger.get(transaction.id)
+            if old is not None:
+                with self._lock:
+                    self._ledger.update(*self._columns(transaction))
+                self._adjust_totals(old, -1)
+                self._adjust_totals(transaction, 1)
+                self._notify("update", [transaction.id])
+                return self._persist("update", transaction.to_dict())
+        return False
+    
+    def delete_transaction(self, transaction_id):
+        """Delete a transaction by ID"""
+        return self.delete_transactions([transaction_id]) > 0
+    
+    def delete_transactions(self, transaction_ids):
+        """Delete several transactions by ID, returns the number deleted"""
+        entries = []
+        for transaction_id in transaction_ids:
+            with self._lock:
+                t = self._ledger.remove(transaction_id)
+            if t is not None:
+                self._adjust_totals(t, -1)
+                entries.append(("delete", {"id": transaction_id}))
+        if not entries:
+            return 0
+        self._notify("delete", [data["id"] for _, data in entries])
+        if not self._persist_many(entries):
+            return 0
+        return len(entries)
+    
+    def get_transaction_by_id(self, transaction_id):
+        """Get a transaction by ID"""
+        return self._ledger.get(transaction_id)
+    
+    def get_transactions_by_ids(self, transaction_ids):
+        """Get the transactions for a list of IDs (missing IDs are skipped)"""
+        return [t for t in (self._ledger.get(i) for i in transaction_ids) if t is not None]
+    
+    def get_next_id(self):
+        """Get next available ID: one past the largest ID loaded or handed out
+        
+        Deleted IDs are not handed out again while the ledger is open, but
+        the counter is not stored: after a restart it continues from the
+        largest remaining ID.
+        """
+        return self._next_id
+    
+    def sorted_transactions(self, newest_first=True):
+        """Live date-ordered sequence of transactions, materialized on access"""
+        return DateOrderedRows(self._ledger, newest_first)
+    
+    def _valid_range(self, start_date, end_date):
+        """Check that both ends of a date range are valid dates
+        
+        Uses the same parser (date_to_ordinal) as the range lookups, so a
+        range that passes here can always be converted.
+        """
+        try:
+            date_to_ordinal(start_date)
+            date_to_ordinal(end_date)
+            return True
+        except (ValueError, TypeError):
+            self._report("Định dạng ngày không hợp lệ")
+            return False
+    
+    def search_text_ids(self, text):
+        """IDs whose description or category match every word of text (prefixes,
+        accents ignored), or None when text has no words"""
+        if not text:
+            return None
+        if self._text_index is None:
+            self._text_index = TextIndex()
+            self._text_index.build(self._ledger)
+        return self._text_index.search(text)
+    
+    def select_transaction_ids(self, start_date=None, end_date=None, transaction_type=None, category=None,
+                               text=None):
+        """IDs in date order matching the filter criteria plus an optional category and text
+        
+        Only the matching slice of the date index is scanned. Raises
+        ValueError for invalid dates.
+        """
+        start = end = None
+        if start_date and end_date:
+            start = date_to_ordinal(start_date)
+            end = date_to_ordinal(end_date)
+        type_code = TYPE_CODES.get(transaction_type)
+        if category in (None, "", "all"):
+            category = None
+        ids = self._ledger.select_ids(start, end, type_code, category)
+        matches = self.search_text_ids(text)
+        if matches is not None:
+            ids = [i for i in ids if i in matches]
+        return ids
+    
+    def iter_transaction_chunks(self, transaction_ids, chunk_size=1000):
+        """Yield lists of transactions for the IDs, one chunk at a time
+        
+        Each chunk is read under the ledger lock, so this generator can be
+        consumed by a worker thread while the UI keeps editing.
+        """
+        ledger = self._ledger
+        for start in range(0, len(transaction_ids), chunk_size):
+            with self._lock:
+                chunk = [ledger.get(i) for i in transaction_ids[start:start + chunk_size]]
+            yield [t for t in chunk if t is not None]
+    
+    def filter_transactions(self, start_date=None, end_date=None, transaction_type=None, text=None):
+        """Filter transactions by date range, type and search text"""
+        matches = self.search_text_ids(text)
+        if matches is not None:
+            return self._filter_matches(matches, start_date, end_date, transaction_type)
+        
+        start, end = self._day_range(start_date, end_date)
+        if start is not None:
+            # Binary search the sorted date index: O(log n + k)
+            filtered = self._ledger.range_views(start, end)
+        else:
+            # Only materialize every row when there is no (valid) range
+            filtered = self.transactions
+        
+        if transaction_type and transaction_type != "all":
+            filtered = [t for t in filtered if t.get_type() == transaction_type]
+            
+        return filtered
+    
+    def _filter_matches(self, matches, start_date, end_date, transaction_type):
+        """Apply the date and type criteria to text search matches, in date order"""
+        if start_date and end_date and self._valid_range(start_date, end_date):
+            start, end = date_to_ordinal(start_date), date_to_ordinal(end_date)
+            range_ids = self._ledger.range_ids(start, end)
+            # Walk whichever side is smaller: the matches or the date range
+            if len(range_ids) < len(matches):
+                filtered = self.get_transactions_by_ids([i for i in range_ids if i in matches])
+            else:
+                filtered = [t for t in self.get_transactions_by_ids(matches)
+                            if start <= date_to_ordinal(t.date) <= end]
+        else:
+            filtered = self.get_transactions_by_ids(matches)
+        if transaction_type and transaction_type != "all":
+            filtered = [t for t in filtered if t.get_type() == transaction_type]
+        filtered.sort(key=lambda t: (t.date, t.id))
+        return filtered
+    
+    def get_summary(self, transactions=None):
+        """Get summary of transactions (the whole ledger comes from the running totals)"""
+        if transactions is None:
+            if self._verify_totals:
+                self.verify_totals()
+            income = self._totals["income"]
+            expense = self._totals["expense"]
+            return {
+                "income": income,
+                "expense": expense,
+                "balance": income - expense,
+                "count": self._totals["count"]
+            }
+            
+        income = sum(t.amount for t in transactions if t.get_type() == "income")
+        expense = sum(t.amount for t in transactions if t.get_type() == "expense")
+        balance = income - expense
+        
+        return {
+            "income": income,
+            "expense": expense,
+            "balance": balance,
+            "count": len(transactions)
+        }
+    
+    def _day_range(self, start_date, end_date):
+        """Day ordinals for a date range, (None, None) for no or an invalid range"""
+        if start_date and end_date and self._valid_range(start_date, end_date):
+            return date_to_ordinal(start_date), date_to_ordinal(end_date)
+        return None, None
+    
+    def get_range_summary(self, start_date=None, end_date=None, transaction_type=None):
+        """Get summary for a date range, answered from the day/month rollups"""
+        start, end = self._day_range(start_date, end_date)
+        return self._analytics.totals(start, end, TYPE_CODES.get(transaction_type))
+    
+    def get_category_totals(self, start_date=None, end_date=None, transaction_type="expense"):
+        """Get total amount per category for a date range and type"""
+        start, end = self._day_range(start_date, end_date)
+        return self._analytics.category_totals(start, end, TYPE_CODES.get(transaction_type))
+    
+    def get_stats(self, start_date=None, end_date=None, top_n=5):
+        """Top expense categories (the rest grouped as "Khác") and totals for a date range"""
+        start, end = self._day_range(start_date, end_date)
+        return self._analytics.stats(start, end, top_n)
+    
+    @timed("TransactionManager.export_to_csv")
+    def export_to_csv(self, filename, start_date=None, end_date=None, transaction_type=None, category=None,
+                      text=None):
+        """Export the matching transactions to a CSV file, streamed in chunks"""
+        try:
+            ids = self.select_transaction_ids(start_date, end_date, transaction_type, category, text)
+            with open(filename, 'w', newline='', encoding='utf-8') as file:
+                write_csv(self.iter_transaction_chunks(ids), file)
+            return True
+        except Exception as e:
+            self._report("Có lỗi khi xuất CSV", e)
+            return False
+    
+    @timed("TransactionManager.export_to_json")
+    def export_to_json(self, filename, start_date=None, end_date=None, transaction_type=None, category=None,
+                       text=None):
+        """Export the matching transactions to a JSON file, streamed in chunks"""
+        try:
+            ids = self.select_transaction_ids(start_date, end_date, transaction_type, category, text)
+            with open(filename, 'w', encoding='utf-8') as file:
+                write_json(self.iter_transaction_chunks(ids), file)
+            return True
+        except Exception as e:
+            self._report("Có lỗi khi xuất JSON", e)
+            return False
+    
+    def start_export(self, filename, file_format, start_date=None, end_date=None,
+                     transaction_type=None, category=None, text=None):
+        """Start a background export of the matching transactions, returns the ExportJob"""
+        ids = self.select_transaction_ids(start_date, end_date, transaction_type, category, text)
+        return ExportJob(filename, file_format, self.iter_transaction_chunks(ids), len(ids)).start()
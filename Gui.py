@@ -1,272 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
-import os
-import csv
+import math
 from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
 from tkcalendar import DateEntry
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from Core import TransactionModel, IncomeTransaction, ExpenseTransaction, TransactionManager
+from ImportExport import ImportJob
+from Profiling import startup, timed
+from VirtualTree import VirtualTreeview, transaction_row_values
 
-# Note: Ensure the following dependencies are installed:
+# Note: Ensure the following dependencies are installed
+# (matplotlib is only imported when the statistics tab is first shown):
 # - tkcalendar: pip install tkcalendar
 # - matplotlib: pip install matplotlib
-# - pandas: pip install pandas
-
-class TransactionModel:
-    """Base model class for managing transaction data"""
-    def __init__(self, id, date, description, amount, category=None):
-        self._id = int(id)  # Ensure ID is an integer
-        try:
-            # Validate and standardize date format
-            self._date = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m-%d")
-        except (ValueError, TypeError):
-            self._date = datetime.now().strftime("%Y-%m-%d")
-        self._description = description if description else ""
-        self._amount = float(amount) if amount else 0.0
-        self._category = category if category else "Khác"
-    
-    @property
-    def id(self):
-        return self._id
-        
-    @property
-    def date(self):
-        return self._date
-        
-    @date.setter
-    def date(self, value):
-        try:
-            self._date = datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
-        except (ValueError, TypeError):
-            self._date = datetime.now().strftime("%Y-%m-%d")
-        
-    @property
-    def description(self):
-        return self._description
-        
-    @description.setter
-    def description(self, value):
-        self._description = value if value else ""
-        
-    @property
-    def amount(self):
-        return self._amount
-        
-    @amount.setter
-    def amount(self, value):
-        self._amount = float(value) if value else 0.0
-        
-    @property
-    def category(self):
-        return self._category
-        
-    @category.setter
-    def category(self, value):
-        self._category = value if value else "Khác"
-    
-    @abstractmethod
-    def get_type(self):
-        """Return the transaction type"""
-        pass
-    
-    def get_display_type(self):
-        """Return display-friendly transaction type"""
-        return "Thu nhập" if self.get_type() == "income" else "Chi tiêu"
-    
-    def to_dict(self):
-        """Convert transaction to dictionary"""
-        return {
-            "id": self._id,
-            "date": self._date,
-            "description": self._description,
-            "amount": self._amount,
-            "type": self.get_type(),
-            "category": self._category
-        }
-    
-    @classmethod
-    def from_dict(cls, data):
-        """Create a transaction from dictionary"""
-        try:
-            if data.get("type") == "income":
-                return IncomeTransaction(
-                    data.get("id", 1), 
-                    data.get("date", datetime.now().strftime("%Y-%m-%d")), 
-                    data.get("description", ""), 
-                    data.get("amount", 0.0), 
-                    data.get("category", "Khác")
-                )
-            else:
-                return ExpenseTransaction(
-                    data.get("id", 1), 
-                    data.get("date", datetime.now().strftime("%Y-%m-%d")), 
-                    data.get("description", ""), 
-                    data.get("amount", 0.0), 
-                    data.get("category", "Khác")
-                )
-        except Exception as e:
-            messagebox.showerror("Lỗi", f"Không thể tạo giao dịch từ dữ liệu: {str(e)}")
-            return None
-
-class IncomeTransaction(TransactionModel):
-    """Model for income transactions"""
-    def get_type(self):
-        return "income"
-
-class ExpenseTransaction(TransactionModel):
-    """Model for expense transactions"""
-    def get_type(self):
-        return "expense"
-
-class TransactionManager:
-    """Manager class for handling transactions"""
-    def __init__(self):
-        self._transactions = []
-        self._filename = "transactions.json"
-        self._income_categories = ["Lương", "Thưởng", "Đầu tư", "Khác"]
-        self._expense_categories = ["Ăn uống", "Đi lại", "Mua sắm", "Giải trí", "Hóa đơn", "Khác"]
-        self.load_transactions()
-    
-    @property
-    def transactions(self):
-        return self._transactions
-    
-    @property
-    def income_categories(self):
-        return self._income_categories
-    
-    @property
-    def expense_categories(self):
-        return self._expense_categories
-    
-    def load_transactions(self):
-        """Load transactions from file"""
-        if os.path.exists(self._filename):
-            try:
-                with open(self._filename, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    self._transactions = [t for t in (TransactionModel.from_dict(d) for d in data) if t is not None]
-            except Exception as e:
-                messagebox.showerror("Lỗi", f"Không thể đọc dữ liệu: {str(e)}")
-                self._transactions = []
-        else:
-            self._transactions = []
-    
-    def save_transactions(self):
-        """Save transactions to file"""
-        try:
-            with open(self._filename, "w", encoding="utf-8") as file:
-                data = [t.to_dict() for t in self._transactions]
-                json.dump(data, file, indent=4, ensure_ascii=False)
-            return True
-        except Exception as e:
-            messagebox.showerror("Lỗi", f"Không thể lưu dữ liệu: {str(e)}")
-            return False
-    
-    def add_transaction(self, transaction):
-        """Add a new transaction"""
-        if transaction:
-            self._transactions.append(transaction)
-            return self.save_transactions()
-        return False
-    
-    def update_transaction(self, transaction):
-        """Update an existing transaction"""
-        if transaction:
-            for i, t in enumerate(self._transactions):
-                if t.id == transaction.id:
-                    self._transactions[i] = transaction
-                    return self.save_transactions()
-        return False
-    
-    def delete_transaction(self, transaction_id):
-        """Delete a transaction by ID"""
-        initial_len = len(self._transactions)
-        self._transactions = [t for t in self._transactions if t.id != transaction_id]
-        if len(self._transactions) < initial_len:
-            return self.save_transactions()
-        return False
-    
-    def get_transaction_by_id(self, transaction_id):
-        """Get a transaction by ID"""
-        for t in self._transactions:
-            if t.id == transaction_id:
-                return t
-        return None
-    
-    def get_next_id(self):
-        """Get next available ID"""
-        if not self._transactions:
-            return 1
-        try:
-            max_id = max(t.id for t in self._transactions if isinstance(t.id, (int, float)))
-            return int(max_id) + 1
-        except (ValueError, TypeError):
-            return 1
-    
-    def filter_transactions(self, start_date=None, end_date=None, transaction_type=None):
-        """Filter transactions by date range and type"""
-        filtered = self._transactions
-        
-        if start_date and end_date:
-            try:
-                start = datetime.strptime(start_date, "%Y-%m-%d").date()
-                end = datetime.strptime(end_date, "%Y-%m-%d").date()
-                filtered = [t for t in filtered if start <= datetime.strptime(t.date, "%Y-%m-%d").date() <= end]
-            except (ValueError, TypeError):
-                messagebox.showwarning("Lỗi", "Định dạng ngày không hợp lệ")
-        
-        if transaction_type and transaction_type != "all":
-            filtered = [t for t in filtered if t.get_type() == transaction_type]
-            
-        return filtered
-    
-    def get_summary(self, transactions=None):
-        """Get summary of transactions"""
-        if transactions is None:
-            transactions = self._transactions
-            
-        income = sum(t.amount for t in transactions if t.get_type() == "income")
-        expense = sum(t.amount for t in transactions if t.get_type() == "expense")
-        balance = income - expense
-        
-        return {
-            "income": income,
-            "expense": expense,
-            "balance": balance,
-            "count": len(transactions)
-        }
-    
-    def export_to_csv(self, filename):
-        """Export transactions to CSV file"""
-        try:
-            with open(filename, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(['ID', 'Ngày', 'Mô tả', 'Số tiền', 'Loại', 'Danh mục'])
-                
-                for t in self._transactions:
-                    writer.writerow([
-                        t.id, t.date, t.description, t.amount,
-                        t.get_display_type(), t.category
-                    ])
-            return True
-        except Exception as e:
-            messagebox.showerror("Lỗi", f"Có lỗi khi xuất CSV: {str(e)}")
-            return False
-    
-    def export_to_json(self, filename):
-        """Export transactions to JSON file"""
-        try:
-            with open(filename, 'w', encoding='utf-8') as file:
-                data = [t.to_dict() for t in self._transactions]
-                json.dump(data, file, indent=4, ensure_ascii=False)
-            return True
-        except Exception as e:
-            messagebox.showerror("Lỗi", f"Có lỗi khi xuất JSON: {str(e)}")
-            return False
+# - numpy (optional, faster statistics): pip install numpy
 
 class BaseView(ABC):
     """Abstract base class for all views"""
@@ -288,6 +36,13 @@ class BaseView(ABC):
         """Update the view with new data"""
         pass
 
+def show_core_error(message, error=None):
+    """TransactionManager error handler: show the failure in a message box"""
+    if error is None:
+        messagebox.showwarning("Lỗi", message)
+    else:
+        messagebox.showerror("Lỗi", f"{message}: {str(error)}")
+
 class TransactionInputView(BaseView):
     """View for transaction input"""
     def __init__(self, parent, controller):
@@ -390,7 +145,7 @@ class TransactionListView(BaseView):
         
         self._tree = ttk.Treeview(tree_frame, 
                                  columns=("ID", "Date", "Desc", "Amount", "Type", "Category"), 
-                                 show="headings", yscrollcommand=tree_scrollbar.set)
+                                 show="headings", selectmode="browse")
         
         self._tree.heading("ID", text="ID")
         self._tree.heading("Date", text="Ngày")
@@ -408,7 +163,7 @@ class TransactionListView(BaseView):
         self._tree.column("Category", width=120)
         
         self._tree.pack(side="left", fill="both", expand=True)
-        tree_scrollbar.config(command=self._tree.yview)
+        self._virtual = VirtualTreeview(self._tree, tree_scrollbar, transaction_row_values)
         
         # Action buttons
         button_frame = ttk.Frame(frame)
@@ -420,42 +175,21 @@ class TransactionListView(BaseView):
     
     def get_selected_id(self):
         """Get selected transaction ID"""
-        selected = self._tree.selection()
-        if not selected:
-            return None
-        try:
-            return int(self._tree.item(selected)["values"][0])
-        except (ValueError, IndexError):
-            return None
+        return self._virtual.selected_id()
     
+    def apply_change(self, kind, transaction_id, transaction=None):
+        """Insert, update or remove a single row, keeping scroll position and selection"""
+        self._virtual.apply_change(kind, transaction_id, transaction)
+    
+    @timed("TransactionListView.update_view")
     def update_view(self, transactions=None):
-        """Update transaction list"""
+        """Update transaction list (only the visible rows are rendered)"""
         if transactions is None:
-            transactions = self._controller.transaction_manager.transactions
-            
-        # Clear current items
-        for item in self._tree.get_children():
-            self._tree.delete(item)
-            
-        # Sort transactions by date (newest first)
-        try:
-            sorted_transactions = sorted(transactions, key=lambda t: datetime.strptime(t.date, "%Y-%m-%d"), reverse=True)
-        except (ValueError, TypeError):
-            sorted_transactions = transactions
-            
-        # Insert transactions
-        for t in sorted_transactions:
-            try:
-                self._tree.insert("", tk.END, values=(
-                    t.id,
-                    t.date,
-                    t.description,
-                    f"{t.amount:,.0f} VND",
-                    t.get_display_type(),
-                    t.category
-                ))
-            except Exception:
-                continue
+            # Live newest-first view over the manager's date index; a
+            # re-render (e.g. after an import batch) keeps the scroll position
+            self._virtual.set_rows(self._controller.transaction_manager.sorted_transactions(), reset=False)
+        else:
+            self._virtual.set_rows(sorted(transactions, key=lambda t: t.date, reverse=True))
 
 class SummaryView(BaseView):
     """View for financial summary"""
@@ -486,11 +220,14 @@ class SummaryView(BaseView):
                    command=self._controller.handle_export_csv).pack(side="left", padx=5)
         ttk.Button(export_frame, text="Xuất JSON", 
                    command=self._controller.handle_export_json).pack(side="left", padx=5)
+        ttk.Button(export_frame, text="Nhập dữ liệu", 
+                   command=self._controller.handle_import).pack(side="left", padx=5)
         
         # Logout button
         ttk.Button(export_frame, text="Đăng xuất", 
                    command=self._controller.logout).pack(side="left", padx=5)
     
+    @timed("SummaryView.update_view")
     def update_view(self, summary=None):
         """Update summary view"""
         if summary is None:
@@ -505,11 +242,32 @@ class SummaryView(BaseView):
             self._income_label.config(text="Thu nhập: 0 VND")
             self._expense_label.config(text="Chi tiêu: 0 VND")
 
+def _load_chart_backend():
+    """Import matplotlib on first use (it is the slowest import of the app)"""
+    from matplotlib import colormaps
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return Figure, FigureCanvasTkAgg, colormaps
+
 class StatsView(BaseView):
-    """View for statistics and charts"""
+    """View for statistics and charts
+    
+    Rendering is skipped when the data did not change, pies whose labels
+    are unchanged only get their wedges moved, and the last few rendered
+    images are kept in an LRU keyed by date range and data version.
+    """
+    CACHE_SIZE = 8
+    
     def __init__(self, parent, controller):
         super().__init__(parent)
         self._controller = controller
+        # Data the figure's artists currently show, and whether the canvas
+        # displays them (a cached image may be displayed instead)
+        self._artist_data = None
+        self._artists_shown = False
+        self._pie_artists = [None, None]
+        self._render_cache = OrderedDict()
+        self._fig = None
         self._setup_ui()
     
     def _setup_ui(self):
@@ -532,17 +290,24 @@ class StatsView(BaseView):
         ttk.Button(date_filter_frame, text="Cập nhật biểu đồ", 
                    command=self._controller.handle_update_charts).pack(side="left", padx=20)
         
-        # Charts frame
-        charts_frame = ttk.Frame(frame)
-        charts_frame.pack(fill="both", expand=True, padx=5, pady=5)
+        # Charts frame (the charts are created when first shown)
+        self._charts_frame = ttk.Frame(frame)
+        self._charts_frame.pack(fill="both", expand=True, padx=5, pady=5)
+    
+    def _ensure_charts(self):
+        """Create the matplotlib figure and canvas on first use"""
+        if self._fig is not None:
+            return
+        with startup.phase("matplotlib"):
+            Figure, FigureCanvasTkAgg, self._colormaps = _load_chart_backend()
         
         # Create matplotlib figure
-        self._fig = plt.Figure(figsize=(10, 6), dpi=100)
+        self._fig = Figure(figsize=(10, 6), dpi=100)
         self._pie1 = self._fig.add_subplot(121)  # Expenses by category
         self._pie2 = self._fig.add_subplot(122)  # Income vs Expense
         
         # Create Tkinter canvas
-        self._canvas = FigureCanvasTkAgg(self._fig, charts_frame)
+        self._canvas = FigureCanvasTkAgg(self._fig, self._charts_frame)
         self._canvas.get_tk_widget().pack(fill="both", expand=True)
     
     def get_date_range(self):
@@ -558,29 +323,87 @@ class StatsView(BaseView):
                 "to_date": datetime.now().strftime("%Y-%m-%d")
             }
     
-    def update_view(self, data=None):
+    def show_cached(self, cache_key):
+        """Display the image cached for cache_key, returns False on a miss"""
+        entry = self._render_cache.get(cache_key)
+        if entry is None:
+            return False
+        data, size, region = entry
+        if size != self._canvas_size():
+            del self._render_cache[cache_key]
+            return False
+        self._render_cache.move_to_end(cache_key)
+        self._canvas.restore_region(region)
+        self._canvas.blit(self._fig.bbox)
+        self._artists_shown = data == self._artist_data
+        return True
+    
+    def _canvas_size(self):
+        return tuple(self._fig.bbox.size)
+    
+    def _cache_render(self, cache_key, data):
+        """Remember the current canvas image for cache_key"""
+        if cache_key is None:
+            return
+        self._render_cache[cache_key] = (data, self._canvas_size(), self._canvas.copy_from_bbox(self._fig.bbox))
+        self._render_cache.move_to_end(cache_key)
+        while len(self._render_cache) > self.CACHE_SIZE:
+            self._render_cache.popitem(last=False)
+    
+    @staticmethod
+    def _pie_series(data):
+        """(labels, sizes) of both pies, an empty pie has no labels"""
+        expense_by_category = data.get("expense_by_category", {})
+        total_income = data.get("total_income", 0)
+        total_expense = data.get("total_expense", 0)
+        series = [(list(expense_by_category.keys()), list(expense_by_category.values()))]
+        if total_income > 0 or total_expense > 0:
+            series.append((['Thu nhập', 'Chi tiêu'], [total_income, total_expense]))
+        else:
+            series.append(([], []))
+        return series
+    
+    @timed("StatsView.update_view")
+    def update_view(self, data=None, cache_key=None):
         """Update charts with data"""
         if data is None:
             return
-            
+        self._ensure_charts()
+        
+        if data == self._artist_data:
+            # Nothing changed: at most re-display the artists' rendering
+            if not self._artists_shown:
+                self._draw(tight_layout=False)
+            self._cache_render(cache_key, data)
+            return
+        
+        old_series = self._pie_series(self._artist_data) if self._artist_data is not None else None
+        new_series = self._pie_series(data)
+        if old_series is not None and all(
+                old[0] == new[0] and (new[0] or artists is None)
+                for old, new, artists in zip(old_series, new_series, self._pie_artists)):
+            # Same labels: move the existing wedges and percentages
+            for artists, (_, sizes) in zip(self._pie_artists, new_series):
+                if artists is not None:
+                    self._update_pie(artists, sizes)
+            self._artist_data = data
+            self._draw(tight_layout=False)
+            self._cache_render(cache_key, data)
+            return
+        
         # Clear old charts
         self._pie1.clear()
         self._pie2.clear()
-        
-        # Extract data
-        expense_by_category = data.get("expense_by_category", {})
-        total_income = data.get("total_income", 0)
-        total_expense = data.get("total_expense", 0)
+        self._pie_artists = [None, None]
         
         # Chart 1: Expenses by category
-        if expense_by_category:
-            labels = list(expense_by_category.keys())
-            sizes = list(expense_by_category.values())
-            
+        labels, sizes = new_series[0]
+        if labels:
             # Create automatic colors
-            colors = plt.cm.tab10(range(len(labels)))
+            colors = self._colormaps["tab10"](range(len(labels)))
             
-            self._pie1.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors)
+            self._pie_artists[0] = self._pie1.pie(sizes, labels=labels, autopct='%1.1f%%',
+                                                  startangle=90, colors=colors)
             self._pie1.axis('equal')
             self._pie1.set_title('Chi tiêu theo danh mục')
         else:
@@ -588,22 +411,53 @@ class StatsView(BaseView):
             self._pie1.axis('off')
         
         # Chart 2: Income vs Expense
-        if total_income > 0 or total_expense > 0:
-            labels = ['Thu nhập', 'Chi tiêu']
-            sizes = [total_income, total_expense]
+        labels, sizes = new_series[1]
+        if labels:
             colors = ['#55a868', '#c44e52']  # Green for income, red for expense
             
-            self._pie2.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors)
+            self._pie_artists[1] = self._pie2.pie(sizes, labels=labels, autopct='%1.1f%%',
+                                                  startangle=90, colors=colors)
             self._pie2.axis('equal')
             self._pie2.set_title('Tỷ lệ thu nhập - chi tiêu')
         else:
             self._pie2.text(0.5, 0.5, 'Không có dữ liệu', ha='center', va='center')
             self._pie2.axis('off')
         
-        # Update canvas
+        self._artist_data = data
+        self._draw(tight_layout=True)
+        self._cache_render(cache_key, data)
+    
+    @staticmethod
+    def _update_pie(artists, sizes):
+        """Move the wedges, labels and percentages of a pie to new sizes
+        
+        Mirrors the geometry of Axes.pie(startangle=90, autopct='%1.1f%%')
+        with the default radius, label and percentage distances.
+        """
+        wedges, texts, autotexts = artists
+        total = float(sum(sizes))
+        theta1 = 90.0
+        for wedge, text, autotext, size in zip(wedges, texts, autotexts, sizes):
+            fraction = size / total if total else 0.0
+            theta2 = theta1 + 360.0 * fraction
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            middle = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text('%1.1f%%' % (100 * fraction))
+            theta1 = theta2
+    
+    @timed("StatsView.draw")
+    def _draw(self, tight_layout):
+        """Render the figure (layout is only recomputed when the artists were rebuilt)"""
         try:
-            self._fig.tight_layout()
+            if tight_layout:
+                self._fig.tight_layout()
             self._canvas.draw()
+            self._artists_shown = True
         except Exception:
             pass
 
@@ -612,6 +466,8 @@ class SearchView(BaseView):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self._controller = controller
+        # Criteria of the results on display (set by update_view)
+        self._criteria = None
         self._setup_ui()
     
     def _setup_ui(self):
@@ -632,6 +488,14 @@ class SearchView(BaseView):
         self._to_date = DateEntry(date_range_frame, width=12, date_pattern='yyyy-mm-dd')
         self._to_date.pack(side="left", padx=5)
         
+        # Search-as-you-type over descriptions and categories (accents optional)
+        ttk.Label(date_range_frame, text="Từ khóa:").pack(side="left", padx=5)
+        self._keyword_var = tk.StringVar()
+        keyword_entry = ttk.Entry(date_range_frame, textvariable=self._keyword_var, width=25)
+        keyword_entry.pack(side="left", padx=5)
+        keyword_entry.bind("<KeyRelease>", self._on_keyword_changed)
+        self._keyword_after = None
+        
         # Row 2: Transaction type and search button
         filter_frame = ttk.Frame(search_frame)
         filter_frame.pack(fill="x", padx=5, pady=5)
@@ -647,6 +511,24 @@ class SearchView(BaseView):
         ttk.Button(filter_frame, text="Tìm kiếm", 
                    command=self._controller.handle_search).pack(side="left", padx=20)
         
+        # Row 3: Export the transactions matching the criteria
+        export_frame = ttk.Frame(search_frame)
+        export_frame.pack(fill="x", padx=5, pady=5)
+        
+        manager = self._controller.transaction_manager
+        categories = ["Tất cả"] + list(dict.fromkeys(manager.expense_categories + manager.income_categories))
+        ttk.Label(export_frame, text="Danh mục:").pack(side="left", padx=5)
+        self._export_category_var = tk.StringVar(value="Tất cả")
+        ttk.Combobox(export_frame, textvariable=self._export_category_var, values=categories,
+                     state="readonly", width=15).pack(side="left", padx=5)
+        
+        ttk.Button(export_frame, text="Xuất CSV", 
+                   command=lambda: self._controller.handle_export_csv(self.get_export_criteria())
+                   ).pack(side="left", padx=5)
+        ttk.Button(export_frame, text="Xuất JSON", 
+                   command=lambda: self._controller.handle_export_json(self.get_export_criteria())
+                   ).pack(side="left", padx=5)
+        
         # Results frame
         result_frame = ttk.LabelFrame(self._frame, text="Kết quả tìm kiếm")
         result_frame.pack(padx=10, pady=10, fill="both", expand=True)
@@ -660,7 +542,7 @@ class SearchView(BaseView):
         
         self._search_tree = ttk.Treeview(tree_frame, 
                                         columns=("ID", "Date", "Desc", "Amount", "Type", "Category"), 
-                                        show="headings", yscrollcommand=search_scrollbar.set)
+                                        show="headings", selectmode="browse")
         
         self._search_tree.heading("ID", text="ID")
         self._search_tree.heading("Date", text="Ngày")
@@ -678,7 +560,7 @@ class SearchView(BaseView):
         self._search_tree.column("Category", width=120)
         
         self._search_tree.pack(side="left", fill="both", expand=True)
-        search_scrollbar.config(command=self._search_tree.yview)
+        self._virtual = VirtualTreeview(self._search_tree, search_scrollbar, transaction_row_values)
         
         # Summary section
         summary_frame = ttk.Frame(result_frame)
@@ -696,21 +578,41 @@ class SearchView(BaseView):
         self._balance_label = ttk.Label(summary_frame, text="Chênh lệch: 0 VND")
         self._balance_label.pack(side="left", padx=20)
     
+    def _on_keyword_changed(self, event=None):
+        """Search shortly after the user stops typing"""
+        if self._keyword_after is not None:
+            self._frame.after_cancel(self._keyword_after)
+        self._keyword_after = self._frame.after(200, self._search_keyword)
+    
+    def _search_keyword(self):
+        self._keyword_after = None
+        self._controller.handle_search()
+    
     def get_search_criteria(self):
         """Get search criteria"""
         try:
             return {
                 "from_date": self._from_date.get_date().strftime("%Y-%m-%d"),
                 "to_date": self._to_date.get_date().strftime("%Y-%m-%d"),
-                "type": self._search_type_var.get()
+                "type": self._search_type_var.get(),
+                "text": self._keyword_var.get().strip()
             }
         except Exception:
             return {
                 "from_date": datetime.now().strftime("%Y-%m-%d"),
                 "to_date": datetime.now().strftime("%Y-%m-%d"),
-                "type": "all"
+                "type": "all",
+                "text": ""
             }
     
+    def get_export_criteria(self):
+        """Get the search criteria plus the export category"""
+        criteria = self.get_search_criteria()
+        category = self._export_category_var.get()
+        criteria["category"] = None if category == "Tất cả" else category
+        return criteria
+    
+    @timed("SearchView.update_view")
     def update_view(self, data=None):
         """Update search results"""
         if data is None:
@@ -718,26 +620,40 @@ class SearchView(BaseView):
             
         transactions = data.get("transactions", [])
         summary = data.get("summary", {})
+        self._criteria = data.get("criteria")
         
-        # Clear current items
-        for item in self._search_tree.get_children():
-            self._search_tree.delete(item)
-        
-        # Display new results
-        for t in sorted(transactions, key=lambda t: t.date, reverse=True):
-            try:
-                self._search_tree.insert("", tk.END, values=(
-                    t.id,
-                    t.date,
-                    t.description,
-                    f"{t.amount:,.0f} VND",
-                    t.get_display_type(),
-                    t.category
-                ))
-            except Exception:
-                continue
-        
-        # Update summary
+        # Display new results (only the visible rows are rendered)
+        self._virtual.set_rows(sorted(transactions, key=lambda t: t.date, reverse=True))
+        self._update_summary(summary)
+    
+    def _matches(self, transaction):
+        """Whether a transaction meets the criteria of the displayed results"""
+        criteria = self._criteria
+        if not criteria:
+            return True
+        if criteria["from_date"] and criteria["to_date"]:
+            if not criteria["from_date"] <= transaction.date <= criteria["to_date"]:
+                return False
+        if criteria["type"] not in (None, "all") and transaction.get_type() != criteria["type"]:
+            return False
+        matches = self._controller.transaction_manager.search_text_ids(criteria["text"])
+        return matches is None or transaction.id in matches
+    
+    def apply_change(self, kind, transaction_id, transaction=None):
+        """Patch the current results after a single update or delete
+        
+        An edited row that no longer meets the search criteria is removed.
+        """
+        rows = self._virtual.rows
+        count = len(rows)
+        if kind == "update" and transaction is not None and not self._matches(transaction):
+            kind = "delete"
+        self._virtual.apply_change(kind, transaction_id, transaction)
+        if kind == "update" or len(rows) != count:
+            self._update_summary(self._controller.transaction_manager.get_summary(rows))
+    
+    def _update_summary(self, summary):
+        """Update the result summary labels"""
         try:
             self._total_label.config(text=f"Tổng kết: {summary['count']} giao dịch")
             self._income_label.config(text=f"Thu nhập: {summary['income']:,.0f} VND")
@@ -751,7 +667,7 @@ class SearchView(BaseView):
 
 class TransactionEditDialog:
     """Dialog for editing a transaction"""
-    def __init__(self, parent, transaction, transaction_manager, callback):
+    def __init__(self, parent, transaction, transaction_manager, callback=None):
         self._parent = parent
         self._transaction = transaction
         self._transaction_manager = transaction_manager
@@ -854,7 +770,8 @@ class TransactionEditDialog:
             
             # Update transaction in manager
             if self._transaction_manager.update_transaction(new_transaction):
-                self._callback()
+                if self._callback:
+                    self._callback()
                 self._dialog.destroy()
             else:
                 messagebox.showerror("Lỗi", "Không thể cập nhật giao dịch", parent=self._dialog)
@@ -864,14 +781,55 @@ class TransactionEditDialog:
         except Exception as e:
             messagebox.showerror("Lỗi", f"Có lỗi xảy ra: {str(e)}", parent=self._dialog)
 
+class ProgressDialog:
+    """Small non-blocking dialog showing the progress of a long task"""
+    def __init__(self, parent, title, on_cancel=None):
+        self._dialog = tk.Toplevel(parent)
+        self._dialog.title(title)
+        self._dialog.geometry("360x130")
+        self._dialog.transient(parent)
+        self._dialog.resizable(False, False)
+        
+        self._label = ttk.Label(self._dialog, text="Đang xử lý...")
+        self._label.pack(padx=10, pady=10, anchor="w")
+        self._progress = ttk.Progressbar(self._dialog, maximum=100, length=330)
+        self._progress.pack(padx=10)
+        if on_cancel:
+            ttk.Button(self._dialog, text="Hủy bỏ", command=on_cancel).pack(pady=10)
+            self._dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    
+    def update_progress(self, fraction, text=None):
+        """Update the bar (fraction 0.0 - 1.0) and the status text"""
+        self._progress["value"] = fraction * 100
+        if text is not None:
+            self._label.config(text=text)
+    
+    def close(self):
+        self._dialog.destroy()
+
 class Controller:
     """Controller to manage interactions between model and views"""
-    def __init__(self, root, username):
-        self.transaction_manager = TransactionManager()
+    # Above this many queued row diffs a hidden list is simply re-rendered
+    MAX_PENDING_CHANGES = 50
+    STORAGE_ERROR_POLL_MS = 500
+    
+    def __init__(self, root, username, transaction_manager=None):
+        # The login screen may hand over a manager it already loaded
+        if transaction_manager is not None:
+            self.transaction_manager = transaction_manager
+            self.transaction_manager.set_error_handler(show_core_error)
+        else:
+            with startup.phase("load transactions"):
+                self.transaction_manager = TransactionManager(username=username, error_handler=show_core_error)
         self.root = root
         self.username = username
         self.root.title("Quản Lý Chi Tiêu")
         self.root.geometry("900x700")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Background writes only record failures; pick them up from here
+        if hasattr(self.transaction_manager.storage, "take_error"):
+            self.root.after(self.STORAGE_ERROR_POLL_MS, self._poll_storage_errors)
         
         # Setup notebook
         self.notebook = ttk.Notebook(self.root)
@@ -889,13 +847,14 @@ class Controller:
         self.notebook.add(self.user_info_tab, text="Thông Tin Người Dùng")
         
         # Initialize views
-        self.input_view = TransactionInputView(self.main_tab, self)
-        self.summary_view = SummaryView(self.main_tab, self)
-        self.list_view = TransactionListView(self.main_tab, self)
-        self.stats_view = StatsView(self.stats_tab, self)
-        self.search_view = SearchView(self.search_tab, self)
-        from UserInfo import UserInfoView
-        self.user_info_view = UserInfoView(self.user_info_tab, self, self.username)
+        with startup.phase("build views"):
+            self.input_view = TransactionInputView(self.main_tab, self)
+            self.summary_view = SummaryView(self.main_tab, self)
+            self.list_view = TransactionListView(self.main_tab, self)
+            self.stats_view = StatsView(self.stats_tab, self)
+            self.search_view = SearchView(self.search_tab, self)
+            from UserInfo import UserInfoView
+            self.user_info_view = UserInfoView(self.user_info_tab, self, self.username)
         
         # Layout views in main tab
         self.summary_view.pack(fill="x")
@@ -907,28 +866,111 @@ class Controller:
         self.search_view.pack(fill="both", expand=True)
         self.user_info_view.pack(fill="both", expand=True)
         
+        # Views are refreshed lazily: changes mark them dirty (or queue row
+        # diffs) and only the views on the selected tab are re-rendered
+        self._dirty = {"summary": True, "list": True, "stats": True}
+        self._pending_list_changes = []
+        self._pending_search_changes = []
+        self.transaction_manager.add_listener(self._on_transactions_changed)
+        self.notebook.bind("<<NotebookTabChanged>>", lambda event: self.refresh_visible_views())
+        
         # Initial update
-        self.update_all_views()
+        with startup.phase("first render"):
+            self.update_all_views()
+        self.root.after_idle(startup.finish, "main window")
+    
+    def _show_storage_error(self, error):
+        messagebox.showerror("Lỗi", f"Không thể lưu dữ liệu: {str(error)}")
+    
+    def _poll_storage_errors(self):
+        """Show failed background writes (on the Tk thread)"""
+        error = self.transaction_manager.storage.take_error()
+        if error is not None:
+            self._show_storage_error(error)
+        self.root.after(self.STORAGE_ERROR_POLL_MS, self._poll_storage_errors)
+    
+    def _close_storage(self):
+        """Flush pending background writes before the window goes away"""
+        try:
+            self.transaction_manager.close()
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Không thể lưu dữ liệu: {str(e)}")
+    
+    def on_close(self):
+        """Lưu dữ liệu còn chờ ghi rồi đóng ứng dụng"""
+        self._close_storage()
+        self.root.destroy()
     
     def logout(self):
         """Đóng cửa sổ hiện tại và mở lại cửa sổ đăng nhập"""
+        self._close_storage()
         self.root.destroy()
         from Login import LoginApp
         root = tk.Tk()
         app = LoginApp(root)
         root.mainloop()
     
+    def _on_transactions_changed(self, kind, transaction_ids):
+        """TransactionManager change notification: mark views dirty"""
+        self._dirty["summary"] = True
+        self._dirty["stats"] = True
+        if kind == "reload" or len(self._pending_list_changes) + len(transaction_ids) > self.MAX_PENDING_CHANGES:
+            self._dirty["list"] = True
+            self._pending_list_changes = []
+        else:
+            self._pending_list_changes.extend((kind, i) for i in transaction_ids)
+        if kind in ("update", "delete"):
+            self._pending_search_changes.extend((kind, i) for i in transaction_ids)
+        self.refresh_visible_views()
+    
+    def _current_tab(self):
+        try:
+            return self.notebook.nametowidget(self.notebook.select())
+        except (KeyError, tk.TclError):
+            return None
+    
+    @timed("Controller.refresh_visible_views")
+    def refresh_visible_views(self):
+        """Re-render the dirty views on the selected tab"""
+        try:
+            tab = self._current_tab()
+            if tab is self.main_tab:
+                if self._dirty["summary"]:
+                    self.summary_view.update_view()
+                    self._dirty["summary"] = False
+                if self._dirty["list"]:
+                    self.list_view.update_view()
+                    self._dirty["list"] = False
+                else:
+                    for kind, transaction_id in self._pending_list_changes:
+                        self.list_view.apply_change(kind, transaction_id,
+                                                    self.transaction_manager.get_transaction_by_id(transaction_id))
+                self._pending_list_changes = []
+            elif tab is self.stats_tab:
+                if self._dirty["stats"]:
+                    self._refresh_stats()
+                    self._dirty["stats"] = False
+            elif tab is self.search_tab:
+                for kind, transaction_id in self._pending_search_changes:
+                    self.search_view.apply_change(kind, transaction_id,
+                                                  self.transaction_manager.get_transaction_by_id(transaction_id))
+                self._pending_search_changes = []
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Không thể cập nhật giao diện: {str(e)}")
+    
+    @timed("Controller.update_all_views")
     def update_all_views(self):
-        """Update all views with current data"""
+        """Mark every view dirty and re-render the ones that are visible"""
+        for key in self._dirty:
+            self._dirty[key] = True
+        self._pending_list_changes = []
         try:
-            self.summary_view.update_view()
-            self.list_view.update_view()
-            self.stats_view.update_view(self._get_stats_data())
-            self.search_view.update_view()
             self.user_info_view.update_view()
         except Exception as e:
             messagebox.showerror("Lỗi", f"Không thể cập nhật giao diện: {str(e)}")
+        self.refresh_visible_views()
     
+    @timed("Controller.handle_add_transaction")
     def handle_add_transaction(self):
         """Handle adding a new transaction"""
         data = self.input_view.get_input_data()
@@ -958,7 +1000,6 @@ class Controller:
             
             if self.transaction_manager.add_transaction(transaction):
                 self.input_view.clear_inputs()
-                self.update_all_views()
                 messagebox.showinfo("Thành công", "Giao dịch đã được thêm!")
             else:
                 messagebox.showerror("Lỗi", "Không thể thêm giao dịch")
@@ -968,6 +1009,7 @@ class Controller:
         except Exception as e:
             messagebox.showerror("Lỗi", f"Có lỗi xảy ra: {str(e)}")
     
+    @timed("Controller.handle_delete_transaction")
     def handle_delete_transaction(self):
         """Handle deleting a transaction"""
         transaction_id = self.list_view.get_selected_id()
@@ -977,11 +1019,11 @@ class Controller:
             
         if messagebox.askyesno("Xác nhận", "Bạn có chắc muốn xóa giao dịch này?"):
             if self.transaction_manager.delete_transaction(transaction_id):
-                self.update_all_views()
                 messagebox.showinfo("Thành công", "Giao dịch đã được xóa!")
             else:
                 messagebox.showerror("Lỗi", "Không thể xóa giao dịch")
     
+    @timed("Controller.handle_edit_transaction")
     def handle_edit_transaction(self):
         """Handle editing a transaction"""
         transaction_id = self.list_view.get_selected_id()
@@ -992,10 +1034,11 @@ class Controller:
         transaction = self.transaction_manager.get_transaction_by_id(transaction_id)
         if transaction:
             try:
-                TransactionEditDialog(self.root, transaction, self.transaction_manager, self.update_all_views)
+                TransactionEditDialog(self.root, transaction, self.transaction_manager)
             except Exception as e:
                 messagebox.showerror("Lỗi", f"Không thể mở cửa sổ chỉnh sửa: {str(e)}")
     
+    @timed("Controller.handle_search")
     def handle_search(self):
         """Handle transaction search"""
         try:
@@ -1003,78 +1046,149 @@ class Controller:
             transactions = self.transaction_manager.filter_transactions(
                 criteria["from_date"],
                 criteria["to_date"],
-                criteria["type"]
+                criteria["type"],
+                criteria["text"]
             )
-            summary = self.transaction_manager.get_summary(transactions)
+            if criteria["text"]:
+                summary = self.transaction_manager.get_summary(transactions)
+            else:
+                # Totals come from the rollups instead of summing the results
+                summary = self.transaction_manager.get_range_summary(
+                    criteria["from_date"],
+                    criteria["to_date"],
+                    criteria["type"]
+                )
             self.search_view.update_view({
                 "transactions": transactions,
-                "summary": summary
+                "summary": summary,
+                "criteria": criteria
             })
         except Exception as e:
             messagebox.showerror("Lỗi", f"Không thể thực hiện tìm kiếm: {str(e)}")
     
-    def handle_export_csv(self):
-        """Handle exporting to CSV"""
+    @timed("Controller.handle_export_csv")
+    def handle_export_csv(self, criteria=None):
+        """Handle exporting to CSV (everything, or the given search criteria)"""
         try:
             filename = filedialog.asksaveasfilename(
                 defaultextension=".csv",
                 filetypes=[("CSV Files", "*.csv")],
                 title="Xuất dữ liệu sang CSV"
             )
-            if filename and self.transaction_manager.export_to_csv(filename):
-                messagebox.showinfo("Thành công", "Dữ liệu đã được xuất thành công!")
+            if filename:
+                self._start_export(filename, "csv", criteria)
         except Exception as e:
             messagebox.showerror("Lỗi", f"Có lỗi khi xuất CSV: {str(e)}")
     
-    def handle_export_json(self):
-        """Handle exporting to JSON"""
+    @timed("Controller.handle_export_json")
+    def handle_export_json(self, criteria=None):
+        """Handle exporting to JSON (everything, or the given search criteria)"""
         try:
             filename = filedialog.asksaveasfilename(
                 defaultextension=".json",
                 filetypes=[("JSON Files", "*.json")],
                 title="Xuất dữ liệu sang JSON"
             )
-            if filename and self.transaction_manager.export_to_json(filename):
-                messagebox.showinfo("Thành công", "Dữ liệu đã được xuất thành công!")
+            if filename:
+                self._start_export(filename, "json", criteria)
         except Exception as e:
             messagebox.showerror("Lỗi", f"Có lỗi khi xuất JSON: {str(e)}")
     
+    def _start_export(self, filename, file_format, criteria=None):
+        """Run an export on a worker thread behind a progress dialog"""
+        criteria = criteria or {}
+        job = self.transaction_manager.start_export(
+            filename, file_format,
+            criteria.get("from_date"),
+            criteria.get("to_date"),
+            criteria.get("type"),
+            criteria.get("category"),
+            criteria.get("text")
+        )
+        dialog = ProgressDialog(self.root, "Xuất dữ liệu", on_cancel=job.cancel)
+        self._poll_export(job, dialog)
+    
+    def _poll_export(self, job, dialog):
+        """Update the export progress until the worker has finished"""
+        if not job.done:
+            dialog.update_progress(job.progress, f"Đã xuất {job.written:,} giao dịch...")
+            self.root.after(50, self._poll_export, job, dialog)
+            return
+        
+        dialog.close()
+        if job.error:
+            messagebox.showerror("Lỗi", f"Có lỗi khi xuất dữ liệu: {str(job.error)}")
+        elif not job.cancelled:
+            messagebox.showinfo("Thành công", f"Dữ liệu đã được xuất thành công! ({job.written:,} giao dịch)")
+    
+    @timed("Controller.handle_import")
+    def handle_import(self):
+        """Handle streaming import of a CSV or JSON bank statement"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("CSV/JSON Files", "*.csv *.json"), ("CSV Files", "*.csv"), ("JSON Files", "*.json")],
+            title="Nhập dữ liệu từ CSV/JSON"
+        )
+        if not filename:
+            return
+        try:
+            job = ImportJob(filename, lambda d: TransactionModel.from_dict(d, raise_errors=True)).start()
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Không thể nhập dữ liệu: {str(e)}")
+            return
+        dialog = ProgressDialog(self.root, "Nhập dữ liệu", on_cancel=job.cancel)
+        self._poll_import(job, dialog, 0)
+    
+    @timed("Controller.poll_import")
+    def _poll_import(self, job, dialog, imported):
+        """Commit the batches parsed so far, then check again shortly"""
+        try:
+            for batch in job.take_batches():
+                if not job.cancelled:
+                    imported += self.transaction_manager.add_transactions(batch, compact=False)
+            dialog.update_progress(job.progress, f"Đã nhập {imported:,} giao dịch...")
+        except Exception as e:
+            job.cancel()
+            job.error = e
+        
+        if not job.finished and not (job.cancelled and job.done):
+            self.root.after(50, self._poll_import, job, dialog, imported)
+            return
+        
+        dialog.close()
+        if imported:
+            # Fold the import's journal entries into the snapshot once
+            self.transaction_manager.save_transactions()
+        if job.error:
+            messagebox.showerror("Lỗi", f"Nhập dữ liệu bị dừng: {str(job.error)}\n"
+                                        f"Đã nhập {imported:,} giao dịch.")
+        elif job.cancelled:
+            messagebox.showinfo("Đã hủy", f"Đã nhập {imported:,} giao dịch trước khi hủy.")
+        else:
+            messagebox.showinfo("Thành công", f"Đã nhập {imported:,} giao dịch, "
+                                              f"bỏ qua {job.invalid:,} dòng không hợp lệ.")
+    
+    @timed("Controller.handle_update_charts")
     def handle_update_charts(self):
         """Handle updating statistics charts"""
         try:
-            self.stats_view.update_view(self._get_stats_data())
+            self._refresh_stats()
+            self._dirty["stats"] = False
         except Exception as e:
             messagebox.showerror("Lỗi", f"Không thể cập nhật biểu đồ: {str(e)}")
     
+    @timed("Controller.refresh_stats")
+    def _refresh_stats(self):
+        """Show the charts for the selected range, from the render cache when possible"""
+        date_range = self.stats_view.get_date_range()
+        cache_key = (date_range["from_date"], date_range["to_date"], self.transaction_manager.data_version)
+        if not self.stats_view.show_cached(cache_key):
+            self.stats_view.update_view(self._get_stats_data(), cache_key)
+    
     def _get_stats_data(self):
         """Get data for statistics charts"""
         try:
             date_range = self.stats_view.get_date_range()
-            transactions = self.transaction_manager.filter_transactions(
-                date_range["from_date"],
-                date_range["to_date"]
-            )
-            
-            expense_by_category = {}
-            for t in transactions:
-                if t.get_type() == "expense":
-                    expense_by_category[t.category] = expense_by_category.get(t.category, 0) + t.amount
-            
-            # Sort and limit to top 5 categories
-            top_expenses = dict(sorted(expense_by_category.items(), key=lambda x: x[1], reverse=True)[:5])
-            if len(expense_by_category) > 5:
-                others_sum = sum(v for k, v in expense_by_category.items() if k not in top_expenses)
-                if others_sum > 0:
-                    top_expenses["Khác"] = others_sum
-            
-            total_income = sum(t.amount for t in transactions if t.get_type() == "income")
-            total_expense = sum(t.amount for t in transactions if t.get_type() == "expense")
-            
-            return {
-                "expense_by_category": top_expenses,
-                "total_income": total_income,
-                "total_expense": total_expense
-            }
+            return self.transaction_manager.get_stats(date_range["from_date"], date_range["to_date"])
         except Exception as e:
             messagebox.showerror("Lỗi", f"Không thể tạo dữ liệu thống kê: {str(e)}")
             return {
@@ -0,0 +1,364 @@
+import codecs
+import csv
+import io
+import json
+import math
+import os
+import queue
+import threading
+from datetime import date, datetime
+
+# Streaming import and export of transactions as CSV files and JSON arrays.
+# Files are read record by record and written chunk by chunk so memory stays
+# flat whatever their size; both run on worker threads.
+
+# Column names accepted in CSV headers / JSON keys (the app's own export
+# headers, English keys and common bank statement names)
+FIELD_ALIASES = {
+    "id": "id",
+    "date": "date", "ngày": "date", "ngày giao dịch": "date",
+    "description": "description", "mô tả": "description", "nội dung": "description",
+    "amount": "amount", "số tiền": "amount",
+    "type": "type", "loại": "type",
+    "category": "category", "danh mục": "category"
+}
+
+TYPE_ALIASES = {
+    "income": "income", "thu nhập": "income", "thu": "income",
+    "expense": "expense", "chi tiêu": "expense", "chi": "expense"
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d")
+
+CSV_HEADER = ['ID', 'Ngày', 'Mô tả', 'Số tiền', 'Loại', 'Danh mục']
+
+
+def _parse_amount(value):
+    """Parse amounts such as 20000, "20,000", "20.000 VND" or "-15000" """
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).upper().replace("VND", "").replace("Đ", "").replace(" ", "").strip()
+    if "," in text and "." in text:
+        # Whichever separator comes last is the decimal point
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif text.count(".") > 1 or (text.count(".") == 1 and len(text.split(".")[1]) == 3):
+        # Dots used as thousands separators
+        text = text.replace(".", "")
+    else:
+        text = text.replace(",", "")
+    return float(text)
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(str(value).strip()).isoformat()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS[1:]:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"Ngày không hợp lệ: {value}")
+
+
+def normalize_record(raw):
+    """Map a raw CSV row / JSON object onto TransactionModel.to_dict() keys
+
+    Raises ValueError for records that cannot be imported (including
+    amounts that are zero, NaN or infinite). A negative amount without an
+    explicit type is treated as an expense.
+    """
+    record = {}
+    for key, value in raw.items():
+        field = FIELD_ALIASES.get(str(key).strip().lower())
+        if field and value not in (None, ""):
+            record[field] = value
+    if "date" not in record or "amount" not in record:
+        raise ValueError("Thiếu ngày hoặc số tiền")
+
+    amount = _parse_amount(record["amount"])
+    type_name = TYPE_ALIASES.get(str(record.get("type", "")).strip().lower())
+    if type_name is None:
+        type_name = "expense" if amount < 0 else "income"
+    amount = abs(amount)
+    if not math.isfinite(amount) or amount <= 0:
+        raise ValueError("Số tiền phải là một số lớn hơn 0")
+
+    return {
+        "id": 0,
+        "date": _parse_date(record["date"]),
+        "description": str(record.get("description", "")).strip(),
+        "amount": amount,
+        "type": type_name,
+        "category": str(record.get("category", "")).strip() or "Khác"
+    }
+
+
+def _iter_decoded_lines(file, progress):
+    """Decode a binary file line by line, reporting bytes read"""
+    for line in file:
+        progress(len(line))
+        yield line.decode("utf-8-sig")
+
+
+def iter_csv_records(file, progress=lambda n: None):
+    """Stream rows of a CSV file (opened in binary mode) as dictionaries"""
+    reader = csv.DictReader(_iter_decoded_lines(file, progress))
+    for row in reader:
+        yield row
+
+
+def iter_json_records(file, progress=lambda n: None, chunk_size=64 * 1024):
+    """Stream the objects of a top-level JSON array without loading it whole"""
+    decoder = json.JSONDecoder()
+    reader = _Utf8ChunkReader(file, chunk_size, progress)
+    buffer = reader.read()
+    pos = 0
+    started = False
+    while True:
+        # Skip whitespace and separators, refilling the buffer as needed
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                break
+            chunk = reader.read()
+            if not chunk:
+                return
+            buffer, pos = buffer[pos:] + chunk, 0
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError("Tệp JSON phải là một mảng giao dịch")
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            chunk = reader.read()
+            if not chunk:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield obj
+        pos = end
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+
+class _Utf8ChunkReader:
+    """Read text chunks from a binary file without splitting UTF-8 sequences"""
+    def __init__(self, file, chunk_size, progress):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._progress = progress
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    def read(self):
+        """Next decoded chunk, "" at end of file"""
+        while True:
+            data = self._file.read(self._chunk_size)
+            self._progress(len(data))
+            text = self._decoder.decode(data, final=not data)
+            if text or not data:
+                return text
+
+
+class ImportJob:
+    """Streaming import running on a worker thread
+
+    The worker parses and validates records with make_transaction(dict) and
+    puts lists of batch_size transactions on a small bounded queue (so
+    reading pauses while the UI thread catches up). The UI thread collects
+    them with take_batches() and commits each batch at once.
+    """
+    def __init__(self, filename, make_transaction, batch_size=5000):
+        self._filename = filename
+        self._make_transaction = make_transaction
+        self._batch_size = batch_size
+        self._batches = queue.Queue(maxsize=4)
+        self._cancelled = threading.Event()
+        self._total_bytes = max(1, os.path.getsize(filename))
+        self._bytes_read = 0
+        self.invalid = 0
+        self.error = None
+        self.done = False
+        self._thread = threading.Thread(target=self._run, name="import", daemon=True)
+
+    @property
+    def progress(self):
+        """Fraction of the file read so far (0.0 - 1.0)"""
+        return min(1.0, self._bytes_read / self._total_bytes)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _count_bytes(self, n):
+        self._bytes_read += n
+
+    def _put(self, batch):
+        while not self._cancelled.is_set():
+            try:
+                self._batches.put(batch, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            with open(self._filename, "rb") as file:
+                if self._filename.lower().endswith(".json"):
+                    records = iter_json_records(file, self._count_bytes)
+                else:
+                    records = iter_csv_records(file, self._count_bytes)
+                batch = []
+                for raw in records:
+                    if self._cancelled.is_set():
+                        break
+                    try:
+                        transaction = self._make_transaction(normalize_record(raw))
+                    except (ValueError, TypeError, AttributeError):
+                        transaction = None
+                    if transaction is None:
+                        self.invalid += 1
+                        continue
+                    batch.append(transaction)
+                    if len(batch) >= self._batch_size:
+                        if not self._put(batch):
+                            break
+                        batch = []
+                if batch and not self._cancelled.is_set():
+                    self._put(batch)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+    def take_batches(self, limit=2):
+        """Collect up to `limit` ready batches without blocking"""
+        batches = []
+        while len(batches) < limit:
+            try:
+                batches.append(self._batches.get_nowait())
+            except queue.Empty:
+                break
+        return batches
+
+    @property
+    def finished(self):
+        """Worker done and every batch collected"""
+        return self.done and self._batches.empty()
+
+
+def write_csv(chunks, file, progress=lambda n: None):
+    """Write chunks (lists) of transactions as CSV, one write per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    file.write(buffer.getvalue())
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([t.id, t.date, t.description, t.amount,
+                          t.get_display_type(), t.category] for t in chunk)
+        file.write(buffer.getvalue())
+        progress(len(chunk))
+
+
+def write_json(chunks, file, progress=lambda n: None):
+    """Write chunks (lists) of transactions as an indented JSON array
+
+    The output matches json.dump(data, indent=4, ensure_ascii=False) but
+    only one chunk is ever held in memory.
+    """
+    first = True
+    file.write("[")
+    for chunk in chunks:
+        if not chunk:
+            progress(0)
+            continue
+        parts = [json.dumps(t.to_dict(), indent=4, ensure_ascii=False).replace("\n", "\n    ")
+                 for t in chunk]
+        file.write(("\n    " if first else ",\n    ") + ",\n    ".join(parts))
+        first = False
+        progress(len(chunk))
+    file.write("]" if first else "\n]")
+
+
+class ExportJob:
+    """Streaming export running on a worker thread
+
+    chunks yields lists of transactions (see
+    TransactionManager.iter_transaction_chunks). The file is written to a
+    temporary name and moved into place when complete, so a cancelled or
+    failed export never leaves a truncated file behind.
+    """
+    def __init__(self, filename, file_format, chunks, total):
+        self._filename = filename
+        self._format = file_format
+        self._chunks = chunks
+        self._total = max(1, total)
+        self._cancelled = threading.Event()
+        self.written = 0
+        self.error = None
+        self.done = False
+        self._thread = threading.Thread(target=self._run, name="export", daemon=True)
+
+    @property
+    def progress(self):
+        """Fraction of the transactions written so far (0.0 - 1.0)"""
+        return min(1.0, self.written / self._total)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _count(self, n):
+        if self._cancelled.is_set():
+            raise _ExportCancelled()
+        self.written += n
+
+    def _run(self):
+        tmp = self._filename + ".tmp"
+        try:
+            newline = "" if self._format == "csv" else None
+            with open(tmp, "w", newline=newline, encoding="utf-8") as file:
+                if self._format == "csv":
+                    write_csv(self._chunks, file, self._count)
+                else:
+                    write_json(self._chunks, file, self._count)
+            os.replace(tmp, self._filename)
+        except _ExportCancelled:
+            pass
+        except Exception as e:
+            self.error = e
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            self.done = True
+
+
+class _ExportCancelled(Exception):
+    pass
@@ -0,0 +1,435 @@
+from array import array
+import bisect
+import struct
+import sys
+from datetime import date
+from functools import lru_cache
+
+# Compact columnar in-memory store for transactions.
+# Every column is a typed array (a few bytes per row) instead of one Python
+# object with a __dict__ per transaction; categories and descriptions are
+# interned into string tables and stored as integer codes.
+
+TYPE_EXPENSE = 0
+TYPE_INCOME = 1
+TYPE_NAMES = ("expense", "income")
+TYPE_CODES = {"expense": TYPE_EXPENSE, "income": TYPE_INCOME}
+
+# Binary snapshot: header, the columns and the date index as raw arrays,
+# then both string tables as NUL-separated UTF-8
+SNAPSHOT_MAGIC = b"QLCL"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sHBxQIIQQ")
+
+
+@lru_cache(maxsize=8192)
+def ordinal_to_date(ordinal):
+    """Convert a day ordinal to a YYYY-MM-DD string"""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def date_to_ordinal(date_str):
+    """Convert a YYYY-MM-DD string to a day ordinal"""
+    return date.fromisoformat(date_str).toordinal()
+
+
+class TransactionView:
+    """Lightweight read-only view of one ledger row
+
+    Exposes the same interface as TransactionModel (id, date, description,
+    amount, category, get_type(), get_display_type(), to_dict()).
+    """
+    __slots__ = ("id", "date", "description", "amount", "category", "_type")
+
+    def __init__(self, id, date, description, amount, category, type_):
+        self.id = id
+        self.date = date
+        self.description = description
+        self.amount = amount
+        self.category = category
+        self._type = type_
+
+    def get_type(self):
+        return self._type
+
+    def get_display_type(self):
+        return "Thu nhập" if self._type == "income" else "Chi tiêu"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "date": self.date,
+            "description": self.description,
+            "amount": self.amount,
+            "type": self._type,
+            "category": self.category
+        }
+
+
+class ColumnarLedger:
+    """Columnar transaction store with an id index and a sorted date index
+
+    - id lookup: direct-address array id -> row (dict fallback for sparse ids)
+    - delete: the last row is moved into the freed slot (O(1))
+    - date index: (day, id) pairs kept sorted in two parallel arrays
+    """
+    def __init__(self):
+        self._ids = array("q")
+        self._days = array("i")
+        self._amounts = array("d")
+        self._types = array("b")
+        self._categories = array("I")
+        self._descriptions = array("I")
+
+        self._category_table = []
+        self._category_codes = {}
+        self._description_table = []
+        self._description_codes = {}
+
+        # Direct-address id index (-1 = absent) plus overflow for very large ids
+        self._row_by_id = array("i")
+        self._overflow_rows = {}
+
+        # Date index sorted by (day, id)
+        self._index_days = array("i")
+        self._index_ids = array("q")
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _snapshot_arrays(self):
+        return (self._ids, self._days, self._amounts, self._types, self._categories,
+                self._descriptions, self._index_days, self._index_ids)
+
+    def to_snapshot(self):
+        """Serialize the ledger to the binary snapshot format
+
+        Returns None if a string contains a NUL character (the table
+        separator); callers then simply keep using the JSON snapshot.
+        """
+        tables = []
+        for table in (self._category_table, self._description_table):
+            if any("\0" in value for value in table):
+                return None
+            tables.append("\0".join(table).encode("utf-8"))
+        header = _SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, sys.byteorder == "little", len(self._ids),
+            len(self._category_table), len(self._description_table), len(tables[0]), len(tables[1])
+        )
+        return b"".join([header] + [column.tobytes() for column in self._snapshot_arrays()] + tables)
+
+    @classmethod
+    def from_snapshot(cls, buffer):
+        """Build a ledger from a binary snapshot (bytes, mmap or memoryview)
+
+        Columns are copied straight out of the buffer; only the id table is
+        rebuilt row by row. Raises ValueError for an unreadable snapshot.
+        """
+        view = memoryview(buffer)
+        try:
+            if len(view) < _SNAPSHOT_HEADER.size:
+                raise ValueError("snapshot too short")
+            (magic, version, little_endian, rows, category_count, description_count,
+             category_bytes, description_bytes) = _SNAPSHOT_HEADER.unpack_from(view)
+            if (magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION
+                    or bool(little_endian) != (sys.byteorder == "little")):
+                raise ValueError("incompatible snapshot")
+            ledger = cls()
+            offset = _SNAPSHOT_HEADER.size
+            for column in ledger._snapshot_arrays():
+                end = offset + rows * column.itemsize
+                if end > len(view):
+                    raise ValueError("truncated snapshot")
+                column.frombytes(view[offset:end])
+                offset = end
+            tables = []
+            for count, size in ((category_count, category_bytes), (description_count, description_bytes)):
+                table = str(view[offset:offset + size], "utf-8").split("\0") if count else []
+                if len(table) != count:
+                    raise ValueError("corrupt string table")
+                tables.append(table)
+                offset += size
+        finally:
+            view.release()
+
+        ledger._category_table, ledger._description_table = tables
+        ledger._category_codes = dict(zip(tables[0], range(category_count)))
+        ledger._description_codes = dict(zip(tables[1], range(description_count)))
+        ids = ledger._ids
+        max_id = max(ids, default=0)
+        if 0 <= min(ids, default=0) and max_id < 2 * rows + 1024:
+            row_by_id = array("i", [-1]) * (max_id + 1)
+            for row, transaction_id in enumerate(ids):
+                row_by_id[transaction_id] = row
+            ledger._row_by_id = row_by_id
+        else:
+            for row, transaction_id in enumerate(ids):
+                ledger._set_row(transaction_id, row)
+        return ledger
+
+    def __contains__(self, transaction_id):
+        return self._row(transaction_id) >= 0
+
+    def __iter__(self):
+        for row in range(len(self._ids)):
+            yield self.view(row)
+
+    @staticmethod
+    def _intern(table, codes, value):
+        code = codes.get(value)
+        if code is None:
+            code = len(table)
+            table.append(value)
+            codes[value] = code
+        return code
+
+    def _row(self, transaction_id):
+        if 0 <= transaction_id < len(self._row_by_id):
+            return self._row_by_id[transaction_id]
+        return self._overflow_rows.get(transaction_id, -1)
+
+    def _set_row(self, transaction_id, row):
+        size = len(self._row_by_id)
+        if 0 <= transaction_id < size:
+            self._row_by_id[transaction_id] = row
+        elif row < 0:
+            self._overflow_rows.pop(transaction_id, None)
+        elif 0 <= transaction_id < 2 * size + 1024:
+            # Ids are handed out sequentially, so grow the dense table and
+            # pull in overflow ids that now fit (negative ids always stay
+            # in the overflow map)
+            new_size = max(transaction_id + 1, 2 * size)
+            self._row_by_id.extend([-1] * (new_size - size))
+            for overflow_id in [i for i in self._overflow_rows if 0 <= i < new_size]:
+                self._row_by_id[overflow_id] = self._overflow_rows.pop(overflow_id)
+            self._row_by_id[transaction_id] = row
+        else:
+            self._overflow_rows[transaction_id] = row
+
+    def columns(self):
+        """The raw row-order columns (read only: never resize them)"""
+        return {
+            "ids": self._ids,
+            "days": self._days,
+            "amounts": self._amounts,
+            "types": self._types,
+            "categories": self._categories,
+            "descriptions": self._descriptions
+        }
+
+    @property
+    def category_table(self):
+        """Category names indexed by the codes in the categories column"""
+        return self._category_table
+
+    @property
+    def description_table(self):
+        """Descriptions indexed by the codes in the descriptions column"""
+        return self._description_table
+
+    def row_of(self, transaction_id):
+        """Row of an id in the columns, or -1"""
+        return self._row(transaction_id)
+
+    def max_id(self):
+        """Largest id in the ledger (0 when empty)"""
+        return max(self._ids, default=0)
+
+    def append(self, transaction_id, day, amount, type_code, category, description, index=True):
+        """Append a row; pass index=False for bulk loads followed by rebuild_index()"""
+        row = len(self._ids)
+        self._ids.append(transaction_id)
+        self._days.append(day)
+        self._amounts.append(amount)
+        self._types.append(type_code)
+        self._categories.append(self._intern(self._category_table, self._category_codes, category))
+        self._descriptions.append(self._intern(self._description_table, self._description_codes, description))
+        self._set_row(transaction_id, row)
+        if index:
+            self._index_insert(day, transaction_id)
+
+    def extend(self, rows):
+        """Append many (id, day, amount, type_code, category, description) rows
+
+        The new rows are sorted on their own and merged into the date index
+        in one pass: the existing index is copied slice by slice between the
+        insertion points, instead of one array insertion per row.
+        """
+        new_keys = []
+        for row in rows:
+            self.append(*row, index=False)
+            new_keys.append((row[1], row[0]))
+        if not new_keys:
+            return
+        new_keys.sort()
+        days, ids = self._index_days, self._index_ids
+        merged_days, merged_ids = array("i"), array("q")
+        prev = 0
+        for day, transaction_id in new_keys:
+            lo = bisect.bisect_left(days, day, prev)
+            hi = bisect.bisect_right(days, day, lo)
+            pos = bisect.bisect_left(ids, transaction_id, lo, hi)
+            merged_days.extend(days[prev:pos])
+            merged_ids.extend(ids[prev:pos])
+            merged_days.append(day)
+            merged_ids.append(transaction_id)
+            prev = pos
+        merged_days.extend(days[prev:])
+        merged_ids.extend(ids[prev:])
+        self._index_days, self._index_ids = merged_days, merged_ids
+
+    def update(self, transaction_id, day, amount, type_code, category, description):
+        """Overwrite the row of an existing id in place"""
+        row = self._row(transaction_id)
+        if row < 0:
+            return False
+        if self._days[row] != day:
+            self._index_remove(self._days[row], transaction_id)
+            self._index_insert(day, transaction_id)
+            self._days[row] = day
+        self._amounts[row] = amount
+        self._types[row] = type_code
+        self._categories[row] = self._intern(self._category_table, self._category_codes, category)
+        self._descriptions[row] = self._intern(self._description_table, self._description_codes, description)
+        return True
+
+    def remove(self, transaction_id):
+        """Remove a row, returning its view (or None if the id is unknown)"""
+        row = self._row(transaction_id)
+        if row < 0:
+            return None
+        removed = self.view(row)
+        self._index_remove(self._days[row], transaction_id)
+        last = len(self._ids) - 1
+        if row != last:
+            for column in (self._ids, self._days, self._amounts, self._types,
+                           self._categories, self._descriptions):
+                column[row] = column[last]
+            self._set_row(self._ids[row], row)
+        for column in (self._ids, self._days, self._amounts, self._types,
+                       self._categories, self._descriptions):
+            del column[last]
+        self._set_row(transaction_id, -1)
+        return removed
+
+    def view(self, row):
+        """Materialize a TransactionView for a row"""
+        return TransactionView(
+            self._ids[row],
+            ordinal_to_date(self._days[row]),
+            self._description_table[self._descriptions[row]],
+            self._amounts[row],
+            self._category_table[self._categories[row]],
+            TYPE_NAMES[self._types[row]]
+        )
+
+    def get(self, transaction_id):
+        """Get the view for an id, or None"""
+        row = self._row(transaction_id)
+        return self.view(row) if row >= 0 else None
+
+    def rebuild_index(self):
+        """Rebuild the date index from scratch"""
+        order = sorted(range(len(self._ids)), key=lambda r: (self._days[r], self._ids[r]))
+        self._index_days = array("i", (self._days[r] for r in order))
+        self._index_ids = array("q", (self._ids[r] for r in order))
+
+    def _index_insert(self, day, transaction_id):
+        lo = bisect.bisect_left(self._index_days, day)
+        hi = bisect.bisect_right(self._index_days, day, lo)
+        pos = bisect.bisect_left(self._index_ids, transaction_id, lo, hi)
+        self._index_days.insert(pos, day)
+        self._index_ids.insert(pos, transaction_id)
+
+    def _index_remove(self, day, transaction_id):
+        lo = bisect.bisect_left(self._index_days, day)
+        hi = bisect.bisect_right(self._index_days, day, lo)
+        pos = bisect.bisect_left(self._index_ids, transaction_id, lo, hi)
+        if pos < hi and self._index_ids[pos] == transaction_id:
+            del self._index_days[pos]
+            del self._index_ids[pos]
+
+    def view_at(self, position):
+        """View of the row at a position of the date index"""
+        return self.view(self._row(self._index_ids[position]))
+
+    def position_of(self, transaction_id):
+        """Position of an id in the date index, or None: O(log n)"""
+        row = self._row(transaction_id)
+        if row < 0:
+            return None
+        day = self._days[row]
+        lo = bisect.bisect_left(self._index_days, day)
+        hi = bisect.bisect_right(self._index_days, day, lo)
+        pos = bisect.bisect_left(self._index_ids, transaction_id, lo, hi)
+        return pos if pos < hi and self._index_ids[pos] == transaction_id else None
+
+    def range_ids(self, start_day, end_day):
+        """Ids with start_day <= day <= end_day, in date order: O(log n + k)"""
+        lo = bisect.bisect_left(self._index_days, start_day)
+        hi = bisect.bisect_right(self._index_days, end_day, lo)
+        return self._index_ids[lo:hi]
+
+    def select_ids(self, start_day=None, end_day=None, type_code=None, category=None):
+        """Ids in date order matching an optional day range, type code and category"""
+        if start_day is not None and end_day is not None:
+            ids = self.range_ids(start_day, end_day)
+        else:
+            ids = self._index_ids[:]
+        if type_code is None and category is None:
+            return ids
+        category_code = self._category_codes.get(category, -1) if category is not None else None
+        selected = array("q")
+        for transaction_id in ids:
+            row = self._row(transaction_id)
+            if type_code is not None and self._types[row] != type_code:
+                continue
+            if category_code is not None and self._categories[row] != category_code:
+                continue
+            selected.append(transaction_id)
+        return selected
+
+    def range_views(self, start_day, end_day):
+        """Views with start_day <= day <= end_day, in date order"""
+        return [self.view(self._row(i)) for i in self.range_ids(start_day, end_day)]
+
+    def totals(self):
+        """Compute income/expense/count with a sequential scan of the columns"""
+        income = 0.0
+        expense = 0.0
+        for amount, type_code in zip(self._amounts, self._types):
+            if type_code == TYPE_INCOME:
+                income += amount
+            else:
+                expense += amount
+        return {"income": income, "expense": expense, "count": len(self._ids)}
+
+
+class DateOrderedRows:
+    """Live, lazily materialized sequence of ledger rows in date order
+
+    Rows are only turned into TransactionView objects when indexed, which
+    lets virtualized lists page through any ledger size.
+    """
+    def __init__(self, ledger, newest_first=True):
+        self._ledger = ledger
+        self._newest_first = newest_first
+
+    def __len__(self):
+        return len(self._ledger)
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self._ledger)
+        if not 0 <= position < len(self._ledger):
+            raise IndexError("row position out of range")
+        if self._newest_first:
+            position = len(self._ledger) - 1 - position
+        return self._ledger.view_at(position)
+
+    def position_of(self, transaction_id):
+        """Current position of an id in this ordering, or None"""
+        position = self._ledger.position_of(transaction_id)
+        if position is None or not self._newest_first:
+            return position
+        return len(self._ledger) - 1 - position
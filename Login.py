@@ -1,43 +1,176 @@
 import random
 import tkinter as tk
 from tkinter import messagebox
-import json
-import os
+import threading
 from datetime import datetime
+from Profiling import startup
+from Storage import migrate_shared_transactions
+from UserStore import get_user_store
+from PasswordHash import HashJob, check_login, hash_password
+
+class AppPreloader:
+    """Warm up the main application on a worker thread while the login screen is idle
+
+    Moves the former shared ledger into per-user partitions, imports Gui and
+    pre-imports matplotlib for the statistics tab. Once a known username is
+    typed (prepare), that user's transactions are loaded into a
+    TransactionManager.
+    """
+    def __init__(self, usernames):
+        self._usernames = list(usernames)
+        self._cond = threading.Condition()
+        self._migrate_lock = threading.Lock()
+        self._migrated = False
+        self._requested = None
+        self._loading = None
+        self._loaded = None  # (username, TransactionManager)
+        self._closed = False
+        self._taken = False
+        self._started = False
+        self._thread = threading.Thread(target=self._run, name="preload", daemon=True)
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            self._thread.start()
+        return self
+
+    def migrate(self):
+        """Split the shared ledger into per-user partitions (once)
+
+        Raises if the split fails; the next call tries again.
+        """
+        with self._migrate_lock:
+            if self._migrated:
+                return
+            migrate_shared_transactions(self._usernames)
+            self._migrated = True
+
+    def prepare(self, username):
+        """Preload username's transactions, replacing any other preloaded user"""
+        with self._cond:
+            if not self._closed:
+                self._requested = username
+                self._cond.notify_all()
+
+    def _next_request(self):
+        with self._cond:
+            while True:
+                username, self._requested = self._requested, None
+                if username is not None and (self._loaded is None or self._loaded[0] != username):
+                    self._loading = username
+                    stale, self._loaded = self._loaded, None
+                    return username, stale
+                if self._closed:
+                    return None, None
+                self._cond.wait()
+
+    def _run(self):
+        try:
+            self.migrate()
+        except Exception:
+            # Nothing to preload from a ledger that is not split yet; login
+            # retries the migration on the Tk thread and reports the error
+            return
+        try:
+            import Gui
+        except Exception:
+            return
+        try:
+            Gui._load_chart_backend()
+        except Exception:
+            pass
+        while True:
+            username, stale = self._next_request()
+            if stale is not None:
+                stale[1].close()
+            if username is None:
+                return
+            manager = Gui.TransactionManager(load=False, username=username)
+            try:
+                manager.load_transactions(raise_errors=True)
+            except Exception:
+                # Let the Tk thread load (and report the error) itself
+                manager.close()
+                manager = None
+            with self._cond:
+                self._loading = None
+                if manager is not None and not self._taken:
+                    self._loaded, manager = (username, manager), None
+                self._cond.notify_all()
+            if manager is not None:
+                manager.close()
+
+    def take_manager(self, username):
+        """Stop preloading and hand over username's TransactionManager (or None)
+
+        Waits if that user's transactions are requested or being loaded.
+        """
+        self.migrate()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            while username in (self._loading, self._requested) and self._thread.is_alive():
+                self._cond.wait(0.1)
+            self._taken = True
+            loaded, self._loaded = self._loaded, None
+        if loaded is None:
+            return None
+        if loaded[0] != username:
+            loaded[1].close()
+            return None
+        return loaded[1]
 
 class LoginApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Ứng dụng đăng nhập")
         self.root.geometry("400x400")
-        self.users_file = "users.json"
-        self.users = self.load_users()
+        self.users = get_user_store()
         self.username = tk.StringVar()
         self.password = tk.StringVar()
         self.email = tk.StringVar()
         self.phone = tk.StringVar()
         self.otp_code = ""
+        self._prepare_job = None
+        self._password_job = None
         self.init_login_ui()
+        # Start warming up the main window once the login screen is drawn
+        self.preloader = AppPreloader(self.users.usernames())
+        self.root.after_idle(self.preloader.start)
+        self.username.trace_add("write", self._on_username_changed)
+
+    def _on_username_changed(self, *args):
+        """Preload the typed user's transactions once typing pauses"""
+        if self._prepare_job is not None:
+            self.root.after_cancel(self._prepare_job)
+        self._prepare_job = self.root.after(300, self._prepare_user)
+
+    def _prepare_user(self):
+        self._prepare_job = None
+        uname = self.username.get()
+        if uname in self.users:
+            self.preloader.prepare(uname)
 
-    def load_users(self):
-        """Tải dữ liệu người dùng từ file users.json"""
-        if os.path.exists(self.users_file):
-            try:
-                with open(self.users_file, "r", encoding="utf-8") as file:
-                    return json.load(file)
-            except Exception:
-                return {}
-        return {}
-
-    def save_users(self):
-        """Lưu dữ liệu người dùng vào file users.json"""
-        try:
-            with open(self.users_file, "w", encoding="utf-8") as file:
-                json.dump(self.users, file, indent=4, ensure_ascii=False)
-            return True
-        except Exception as e:
-            messagebox.showerror("Lỗi", f"Không thể lưu dữ liệu người dùng: {str(e)}")
-            return False
+    def run_password_job(self, func, args, on_done):
+        """Hash/verify passwords on a worker thread, then on_done(result) on the Tk thread"""
+        if self._password_job is not None:
+            return
+        self._password_job = HashJob(func, *args).start()
+        self.root.config(cursor="watch")
+        self.root.after(20, self._poll_password_job, on_done)
+
+    def _poll_password_job(self, on_done):
+        job = self._password_job
+        if not job.done:
+            self.root.after(20, self._poll_password_job, on_done)
+            return
+        self._password_job = None
+        self.root.config(cursor="")
+        if job.error is not None:
+            messagebox.showerror("Lỗi", f"Có lỗi xảy ra: {str(job.error)}")
+            return
+        on_done(job.result)
 
     def send_otp_via_email(self, email_to):
         """Giả lập gửi OTP qua email (hiển thị qua messagebox)"""
@@ -129,17 +262,10 @@ class LoginApp:
             messagebox.showerror("Lỗi", f"Vui lòng nhập {method}!")
             return
 
-        found_user = None
         if method == "email":
-            for user, data in self.users.items():
-                if data.get("email") == contact:
-                    found_user = user
-                    break
-        elif method == "phone":
-            for user, data in self.users.items():
-                if data.get("phone") == contact:
-                    found_user = user
-                    break
+            found_user = self.users.find_by_email(contact)
+        else:
+            found_user = self.users.find_by_phone(contact)
 
         if not found_user:
             messagebox.showerror("Lỗi", f"Không tìm thấy {method} đã đăng ký.")
@@ -175,12 +301,17 @@ class LoginApp:
             if otp_var.get() != self.otp_code:
                 messagebox.showerror("Lỗi", "Mã OTP không chính xác.")
                 return
-            self.users[self.username.get()]["password"] = self.password.get()
-            if self.save_users():
+            uname = self.username.get()
+
+            def save_password(password_hash):
+                try:
+                    self.users.update(uname, password=password_hash)
+                except Exception as e:
+                    messagebox.showerror("Lỗi", f"Không thể cập nhật mật khẩu: {str(e)}")
+                    return
                 messagebox.showinfo("Thành công", "Mật khẩu đã được cập nhật.")
                 self.init_login_ui()
-            else:
-                messagebox.showerror("Lỗi", "Không thể cập nhật mật khẩu.")
+            self.run_password_job(hash_password, (self.password.get(),), save_password)
 
         tk.Button(self.root, text="Xác nhận", font=("Arial", 12), command=reset_password).pack(pady=10)
 
@@ -191,18 +322,40 @@ class LoginApp:
         if not uname or not pword:
             messagebox.showerror("Lỗi", "Vui lòng nhập tên đăng nhập và mật khẩu!")
             return
-        if uname in self.users and self.users[uname]["password"] == pword:
-            messagebox.showinfo("Thành công", "Đăng nhập thành công!")
-            self.root.destroy()
+        user = self.users.get(uname)
+        stored = user.get("password") if user is not None else None
+        self.run_password_job(check_login, (pword, stored),
+                              lambda result: self._finish_login(uname, *result))
+
+    def _finish_login(self, uname, ok, new_hash):
+        """Open the main window once the password has been verified"""
+        if not ok:
+            messagebox.showerror("Lỗi", "Tên đăng nhập hoặc mật khẩu sai.")
+            return
+        if new_hash is not None:
+            # Legacy plaintext (or cheaper) hash: store the upgraded one
             try:
+                self.users.update(uname, password=new_hash)
+            except Exception:
+                pass
+        try:
+            self.preloader.migrate()
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Không thể tách dữ liệu giao dịch theo người dùng: {str(e)}")
+            return
+        messagebox.showinfo("Thành công", "Đăng nhập thành công!")
+        self.root.destroy()
+        startup.restart()
+        try:
+            with startup.phase("wait for preload"):
+                manager = self.preloader.take_manager(uname)
+            with startup.phase("import Gui"):
                 import Gui
-                root = tk.Tk()
-                app = Gui.Controller(root, uname)
-                root.mainloop()
-            except Exception as e:
-                messagebox.showerror("Lỗi", f"Không thể mở ứng dụng: {str(e)}")
-        else:
-            messagebox.showerror("Lỗi", "Tên đăng nhập hoặc mật khẩu sai.")
+            root = tk.Tk()
+            app = Gui.Controller(root, uname, manager)
+            root.mainloop()
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Không thể mở ứng dụng: {str(e)}")
 
     def register(self):
         """Xử lý đăng ký"""
@@ -222,21 +375,27 @@ class LoginApp:
         if not phone.isdigit():
             messagebox.showerror("Lỗi", "Số điện thoại không hợp lệ!")
             return
-        self.users[uname] = {
-            "password": pword,
-            "name": "",
-            "dob": datetime.now().strftime("%Y-%m-%d"),
-            "email": email,
-            "phone": phone,
-            "role": "Sinh viên"
-        }
-        if self.save_users():
+
+        def add_user(password_hash):
+            try:
+                self.users.add(uname, {
+                    "password": password_hash,
+                    "name": "",
+                    "dob": datetime.now().strftime("%Y-%m-%d"),
+                    "email": email,
+                    "phone": phone,
+                    "role": "Sinh viên"
+                })
+            except Exception as e:
+                messagebox.showerror("Lỗi", f"Không thể đăng ký: {str(e)}")
+                return
             messagebox.showinfo("Thành công", "Đăng ký thành công!")
             self.init_login_ui()
-        else:
-            messagebox.showerror("Lỗi", "Không thể đăng ký.")
+        self.run_password_job(hash_password, (pword,), add_user)
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = LoginApp(root)
+    with startup.phase("login window"):
+        app = LoginApp(root)
+    root.after_idle(startup.finish, "login window")
     root.mainloop()
\ No newline at end of file
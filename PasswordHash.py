@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+
+# Salted password hashing with PBKDF2-HMAC-SHA256. Stored hashes look like
+#   pbkdf2_sha256$<iterations>$<salt (base64)>$<hash (base64)>
+# Anything else in the "password" field is a legacy plaintext password,
+# upgraded to a hash on the next successful login. The cost is set with
+# QLCT_PASSWORD_ITERATIONS; `python PasswordHash.py [target ms]` measures
+# which cost gives a target verification time on this machine.
+
+ALGORITHM = "pbkdf2_sha256"
+DEFAULT_ITERATIONS = 600000
+SALT_BYTES = 16
+
+
+def default_iterations():
+    """PBKDF2 iterations for new hashes (QLCT_PASSWORD_ITERATIONS)"""
+    try:
+        return max(1000, int(os.environ.get("QLCT_PASSWORD_ITERATIONS", DEFAULT_ITERATIONS)))
+    except ValueError:
+        return DEFAULT_ITERATIONS
+
+
+def _derive(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+def _parse(stored):
+    """(iterations, salt, digest) of a stored hash, None for plaintext"""
+    parts = str(stored).split("$")
+    if len(parts) != 4 or parts[0] != ALGORITHM:
+        return None
+    try:
+        return (int(parts[1]), base64.b64decode(parts[2], validate=True),
+                base64.b64decode(parts[3], validate=True))
+    except ValueError:
+        return None
+
+
+def hash_password(password, iterations=None):
+    """Salted hash of password in the stored format"""
+    iterations = iterations or default_iterations()
+    salt = os.urandom(SALT_BYTES)
+    digest = _derive(password, salt, iterations)
+    return "$".join((ALGORITHM, str(iterations),
+                     base64.b64encode(salt).decode("ascii"), base64.b64encode(digest).decode("ascii")))
+
+
+def is_hashed(stored):
+    return _parse(stored) is not None
+
+
+def verify_password(password, stored):
+    """Check password against a stored hash (or legacy plaintext)"""
+    if stored is None:
+        return False
+    parsed = _parse(stored)
+    if parsed is None:
+        return hmac.compare_digest(str(stored).encode("utf-8"), password.encode("utf-8"))
+    iterations, salt, digest = parsed
+    return hmac.compare_digest(_derive(password, salt, iterations), digest)
+
+
+def needs_rehash(stored, iterations=None):
+    """Whether stored is plaintext or hashed with a lower cost than configured"""
+    parsed = _parse(stored)
+    return parsed is None or parsed[0] < (iterations or default_iterations())
+
+
+def check_login(password, stored):
+    """Verify a login attempt; returns (ok, new hash to store or None)
+
+    Unknown users (stored is None) still pay for one hash so the response
+    time does not reveal which usernames exist.
+    """
+    if stored is None:
+        hash_password(password)
+        return False, None
+    if not verify_password(password, stored):
+        return False, None
+    return True, (hash_password(password) if needs_rehash(stored) else None)
+
+
+class HashJob:
+    """Run a (CPU-heavy) password function on a worker thread
+
+    The Tk thread polls `done` and then reads `result` or `error`.
+    """
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+        self.result = None
+        self.error = None
+        self.done = False
+        self._thread = threading.Thread(target=self._run, name="password", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self._func(*self._args)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+
+def calibrate_iterations(target_ms=250, trial_iterations=50000, rounds=3):
+    """PBKDF2 iterations that take about target_ms on this machine"""
+    salt = os.urandom(SALT_BYTES)
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        _derive("benchmark", salt, trial_iterations)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    per_iteration_ms = best * 1000 / trial_iterations
+    # Round down to a multiple of 10000 iterations
+    return max(10000, int(target_ms / per_iteration_ms) // 10000 * 10000)
+
+
+if __name__ == "__main__":
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 250
+    iterations = calibrate_iterations(target_ms)
+    started = time.perf_counter()
+    verify_password("benchmark", hash_password("benchmark", iterations))
+    verify_ms = (time.perf_counter() - started) * 1000 / 2
+    print(f"{iterations} iterations ~ {verify_ms:.0f} ms per hash (target {target_ms:.0f} ms)")
+    print(f"QLCT_PASSWORD_ITERATIONS={iterations}")
@@ -0,0 +1,241 @@
+import atexit
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Startup timing: wall-clock time of each startup phase and the modules it
+# imported, reported against a time-to-first-window budget.
+# Enable with QLCT_STARTUP_REPORT=1 (budget: QLCT_STARTUP_BUDGET_MS);
+# `python -X importtime Login.py` gives the per-module detail.
+#
+# Hot-path spans: @timed methods (Controller handlers, TransactionManager
+# I/O, view updates) record their durations in in-memory histograms.
+# Enable with QLCT_PROFILE=1; the report is printed when the app exits
+# (and written as JSON to QLCT_PROFILE_FILE if set).
+# QLCT_PROFILE_ACTION=<span name> runs the first call of that span under
+# cProfile and saves the stats to profile_<span name>.prof.
+
+DEFAULT_STARTUP_BUDGET_MS = 1500
+
+
+class StartupTimer:
+    """Collects named startup phases until the first window is shown"""
+    def __init__(self, enabled=None, budget_ms=None):
+        self._start = time.perf_counter()
+        self._phases = []
+        self._finished = False
+        self.enabled = (enabled if enabled is not None
+                        else os.environ.get("QLCT_STARTUP_REPORT") == "1")
+        if budget_ms is None:
+            budget_ms = float(os.environ.get("QLCT_STARTUP_BUDGET_MS", DEFAULT_STARTUP_BUDGET_MS))
+        self.budget_ms = budget_ms
+
+    def restart(self):
+        """Start timing a new milestone (e.g. the main window after login)"""
+        self._start = time.perf_counter()
+        self._phases = []
+        self._finished = False
+
+    def elapsed_ms(self):
+        """Milliseconds since the timer was created"""
+        return (time.perf_counter() - self._start) * 1000
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block and record which modules it imported"""
+        modules_before = set(sys.modules)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            imported = set(sys.modules) - modules_before
+            self._phases.append((name, seconds, imported))
+
+    @staticmethod
+    def _group_modules(modules):
+        """{top-level package: number of modules} for a set of module names"""
+        groups = {}
+        for module in modules:
+            package = module.split(".")[0]
+            groups[package] = groups.get(package, 0) + 1
+        return groups
+
+    def report(self, milestone="first window"):
+        """Text report of the phases so far"""
+        total_ms = self.elapsed_ms()
+        lines = [f"Startup: {milestone} after {total_ms:.0f} ms (budget {self.budget_ms:.0f} ms)"]
+        for name, seconds, imported in self._phases:
+            line = f"  {name:<24} {seconds * 1000:8.1f} ms"
+            if imported:
+                groups = sorted(self._group_modules(imported).items(), key=lambda x: x[1], reverse=True)
+                packages = ", ".join(f"{package} ({count})" for package, count in groups[:5])
+                line += f"  imports {len(imported)} modules: {packages}"
+            lines.append(line)
+        if total_ms > self.budget_ms:
+            lines.append(f"  WARNING: over budget by {total_ms - self.budget_ms:.0f} ms")
+        return "\n".join(lines)
+
+    def finish(self, milestone="first window"):
+        """Print the report once (when enabled), returns the elapsed ms"""
+        elapsed = self.elapsed_ms()
+        if self.enabled and not self._finished:
+            print(self.report(milestone), file=sys.stderr)
+        self._finished = True
+        return elapsed
+
+
+# Shared timer for the application's startup
+startup = StartupTimer()
+
+
+class Histogram:
+    """Durations in power-of-two microsecond buckets, plus count/total/min/max"""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self._buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        # Bucket b holds durations up to 2**b microseconds
+        bucket = max(0, math.frexp(seconds * 1e6)[1])
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls, in seconds"""
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= target:
+                return min(self.max, 2 ** bucket / 1e6)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "min_ms": (self.min or 0.0) * 1000,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+            "buckets_us": {str(2 ** bucket): count for bucket, count in sorted(self._buckets.items())}
+        }
+
+
+class Instrumentation:
+    """Named timing spans collected into histograms"""
+    def __init__(self, enabled=None, capture=None, report_file=None):
+        self.capture = capture if capture is not None else os.environ.get("QLCT_PROFILE_ACTION") or None
+        self.enabled = (enabled if enabled is not None
+                        else os.environ.get("QLCT_PROFILE") == "1" or self.capture is not None)
+        self.report_file = report_file if report_file is not None else os.environ.get("QLCT_PROFILE_FILE")
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._profiling = False
+        if self.enabled:
+            atexit.register(self.finish)
+
+    def _start_capture(self, name):
+        """A running cProfile.Profile if this span is the action to capture"""
+        if name != self.capture or self._profiling:
+            return None
+        import cProfile
+        self._profiling = True
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active
+            self._profiling = False
+            return None
+        return profiler
+
+    def _finish_capture(self, name, profiler):
+        import pstats
+        profiler.disable()
+        self.capture = None
+        self._profiling = False
+        filename = "profile_" + "".join(c if c.isalnum() or c in "._-" else "_" for c in name) + ".prof"
+        profiler.dump_stats(filename)
+        print(f"Profile of {name} saved to {filename}", file=sys.stderr)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+
+    @contextmanager
+    def span(self, name):
+        """Time a block into the histogram `name` (does nothing when disabled)"""
+        if not self.enabled:
+            yield
+            return
+        profiler = self._start_capture(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            if profiler is not None:
+                self._finish_capture(name, profiler)
+            self.record(name, seconds)
+
+    def record(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def histograms(self):
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in self._histograms.items()}
+
+    def report(self):
+        """Text table of the spans, slowest total first (times include nested spans)"""
+        rows = sorted(self.histograms().items(), key=lambda x: x[1]["total_ms"], reverse=True)
+        lines = [f"{'span':<40} {'calls':>7} {'total ms':>10} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}"]
+        for name, h in rows:
+            lines.append(f"{name:<40} {h['count']:>7} {h['total_ms']:>10.1f} {h['mean_ms']:>9.2f} "
+                         f"{h['p50_ms']:>9.2f} {h['p95_ms']:>9.2f} {h['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+    def finish(self):
+        """Print the report (and write QLCT_PROFILE_FILE), called at exit"""
+        if not self._histograms:
+            return
+        print(self.report(), file=sys.stderr)
+        if self.report_file:
+            with open(self.report_file, "w", encoding="utf-8") as file:
+                json.dump(self.histograms(), file, indent=4, ensure_ascii=False)
+
+
+# Shared spans for the application's hot paths
+instrumentation = Instrumentation()
+
+
+def timed(name):
+    """Decorator timing every call in the span `name`
+
+    Applied at import time: without QLCT_PROFILE the function is returned
+    unchanged, so disabled instrumentation costs nothing.
+    """
+    def decorate(func):
+        if not instrumentation.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with instrumentation.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,111 @@
+import bisect
+import re
+import unicodedata
+
+# Inverted index for text search over transaction descriptions and
+# categories. Text is folded to lower case without Vietnamese diacritics
+# ("Bánh mì" -> "banh mi") so searches work with or without accents.
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold_text(text):
+    """Lower-case text with diacritics removed ("Đi lại" -> "di lai")"""
+    text = str(text).lower().replace("đ", "d")
+    return "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Folded word tokens of a text"""
+    return _TOKEN_RE.findall(fold_text(text))
+
+
+class TextIndex:
+    """Token -> transaction ids, with a sorted vocabulary for prefix search
+
+    Every query term matches the tokens it is a prefix of ("caf" finds
+    "cafe"), and all terms must match. add()/remove() keep the index in
+    step with single changes; build() indexes a whole ledger at once.
+    """
+    def __init__(self):
+        self._postings = {}
+        self._vocabulary = []
+
+    def __len__(self):
+        return len(self._postings)
+
+    def _tokens(self, description, category):
+        return set(tokenize(description)) | set(tokenize(category))
+
+    def _add_tokens(self, transaction_id, tokens):
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                self._postings[token] = ids = set()
+                bisect.insort(self._vocabulary, token)
+            ids.add(transaction_id)
+
+    def add(self, transaction_id, description, category):
+        """Index one transaction"""
+        self._add_tokens(transaction_id, self._tokens(description, category))
+
+    def remove(self, transaction_id, description, category):
+        """Remove one transaction (given the text it was indexed with)"""
+        for token in self._tokens(description, category):
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(transaction_id)
+            if not ids:
+                del self._postings[token]
+                position = bisect.bisect_left(self._vocabulary, token)
+                del self._vocabulary[position]
+
+    def build(self, ledger):
+        """Index every row of a ColumnarLedger
+
+        Rows are grouped by their interned description and category codes,
+        so each distinct text is tokenized once and whole groups of ids are
+        added to a posting set at a time.
+        """
+        columns = ledger.columns()
+        for codes, table in ((columns["descriptions"], ledger.description_table),
+                             (columns["categories"], ledger.category_table)):
+            ids_by_code = {}
+            for transaction_id, code in zip(columns["ids"], codes):
+                ids = ids_by_code.get(code)
+                if ids is None:
+                    ids_by_code[code] = ids = []
+                ids.append(transaction_id)
+            for code, ids in ids_by_code.items():
+                for token in set(tokenize(table[code])):
+                    posting = self._postings.get(token)
+                    if posting is None:
+                        self._postings[token] = posting = set()
+                    posting.update(ids)
+        self._vocabulary = sorted(self._postings)
+
+    def _prefix_matches(self, prefix):
+        """Union of the ids of every token starting with prefix"""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(self._postings[token])
+        if len(matches) == 1:
+            return matches[0]
+        return set().union(*matches)
+
+    def search(self, query):
+        """Ids matching every term of the query, or None for an empty query"""
+        terms = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not terms:
+            return None
+        result = None
+        for term in terms:
+            ids = self._prefix_matches(term)
+            result = set(ids) if result is None else result & ids
+            if not result:
+                return set()
+        return result
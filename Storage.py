@@ -0,0 +1,582 @@
+import atexit
+import hashlib
+import json
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import struct
+import threading
+import time
+
+# Storage backends for TransactionManager.
+# Backends only deal with plain dictionaries (TransactionModel.to_dict()),
+# the manager is responsible for turning them into model objects.
+
+# Header of the binary snapshot file: magic, then the size and mtime of the
+# JSON snapshot it was written against (a mismatch means it is stale)
+_BINARY_HEADER = struct.Struct("<8sQq")
+_BINARY_MAGIC = b"QLCTSNAP"
+
+
+def _ensure_parent_dir(filename):
+    """Create the directory a data file is about to be written into"""
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+def _retire_json_ledger(filename):
+    """Rename a migrated JSON snapshot and journal (*.migrated), drop its binary copy"""
+    for name in (filename, os.path.splitext(filename)[0] + ".journal"):
+        if os.path.exists(name):
+            os.replace(name, name + MIGRATED_SUFFIX)
+    binary = os.path.splitext(filename)[0] + ".bin"
+    if os.path.exists(binary):
+        os.remove(binary)
+
+
+class JsonStorage:
+    """JSON snapshot storage with an append-only journal
+
+    Every mutation is appended to the journal file as one JSON line
+    ({"op": "add"|"update"|"delete", "data": {...}}) so its cost scales with
+    the change instead of the whole history. The journal is replayed on
+    load and folded back into the snapshot by save_all().
+
+    With binary_snapshot, save_binary() also keeps a binary copy of the
+    data next to the JSON (see ColumnarLedger.to_snapshot) that
+    load_binary() memory-maps on the next start instead of parsing JSON.
+    """
+    def __init__(self, filename="transactions.json", journal=True, compact_threshold=500, binary_snapshot=True):
+        self._filename = filename
+        self._journal_filename = os.path.splitext(filename)[0] + ".journal"
+        self._binary_filename = os.path.splitext(filename)[0] + ".bin"
+        self._binary_snapshot = binary_snapshot
+        self._journal = journal
+        self._compact_threshold = compact_threshold
+        self._journal_count = 0
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def journal_filename(self):
+        return self._journal_filename
+
+    @property
+    def binary_filename(self):
+        return self._binary_filename
+
+    def _json_stamp(self):
+        """(size, mtime) of the JSON snapshot, or None if there is none"""
+        try:
+            stat = os.stat(self._filename)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def load_binary(self, parse):
+        """Load the binary snapshot with parse(buffer) if it is up to date
+
+        Returns (parse result, journal entries to replay on top of it), or
+        None when there is no usable binary snapshot and load() should be
+        used instead. The journal replay is idempotent, so the binary
+        snapshot may already contain some of the journal's changes.
+        """
+        if not self._binary_snapshot or not os.path.exists(self._binary_filename):
+            return None
+        stamp = self._json_stamp()
+        with open(self._binary_filename, "rb") as file:
+            if os.fstat(file.fileno()).st_size < _BINARY_HEADER.size:
+                return None
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                magic, size, mtime_ns = _BINARY_HEADER.unpack_from(buffer)
+                if magic != _BINARY_MAGIC or stamp != (size, mtime_ns):
+                    return None
+                view = memoryview(buffer)
+                data = view[_BINARY_HEADER.size:]
+                try:
+                    result = parse(data)
+                finally:
+                    data.release()
+                    view.release()
+        entries = self._read_journal()
+        self._journal_count = len(entries)
+        return result, entries
+
+    def save_binary(self, data):
+        """Write the binary snapshot, stamped with the current JSON snapshot"""
+        stamp = self._json_stamp()
+        if not self._binary_snapshot or data is None or stamp is None:
+            return
+        tmp_filename = self._binary_filename + ".tmp"
+        with open(tmp_filename, "wb") as file:
+            file.write(_BINARY_HEADER.pack(_BINARY_MAGIC, *stamp))
+            file.write(data)
+        os.replace(tmp_filename, self._binary_filename)
+
+    def load(self):
+        """Load the snapshot and replay the journal on top of it"""
+        records = []
+        if os.path.exists(self._filename):
+            with open(self._filename, "r", encoding="utf-8") as file:
+                records = json.load(file)
+
+        entries = self._read_journal()
+        self._journal_count = len(entries)
+        if not entries:
+            return records
+
+        by_id = {}
+        # Records repeating an id are kept as they are (the manager gives
+        # them new ids); the journal applies to the first one
+        duplicates = []
+        for record in records:
+            record_id = int(record.get("id", 1))
+            if record_id in by_id:
+                duplicates.append(record)
+            else:
+                by_id[record_id] = record
+        for entry in entries:
+            op = entry.get("op")
+            data = entry.get("data", {})
+            record_id = int(data.get("id", 1))
+            if op == "delete":
+                by_id.pop(record_id, None)
+            elif op in ("add", "update"):
+                by_id[record_id] = data
+        return list(by_id.values()) + duplicates
+
+    def _read_journal(self):
+        """Read journal entries, ignoring a truncated last line"""
+        entries = []
+        if not os.path.exists(self._journal_filename):
+            return entries
+        with open(self._journal_filename, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # Partially written record from an interrupted append
+                    break
+        return entries
+
+    def append(self, op, data):
+        """Append one mutation to the journal"""
+        self.append_many([(op, data)])
+
+    def append_many(self, entries):
+        """Append several (op, data) mutations to the journal in one write"""
+        if not self._journal or not entries:
+            return
+        lines = "".join(json.dumps({"op": op, "data": data}, ensure_ascii=False) + "\n" for op, data in entries)
+        _ensure_parent_dir(self._journal_filename)
+        with open(self._journal_filename, "a", encoding="utf-8") as file:
+            file.write(lines)
+        self._journal_count += len(entries)
+
+    def needs_compaction(self):
+        """Whether the journal has grown past the compaction threshold"""
+        return not self._journal or self._journal_count >= self._compact_threshold
+
+    def save_all(self, records):
+        """Write a full snapshot atomically and reset the journal"""
+        tmp_filename = self._filename + ".tmp"
+        _ensure_parent_dir(tmp_filename)
+        with open(tmp_filename, "w", encoding="utf-8") as file:
+            json.dump(records, file, indent=4, ensure_ascii=False)
+        os.replace(tmp_filename, self._filename)
+        if os.path.exists(self._journal_filename):
+            os.remove(self._journal_filename)
+        self._journal_count = 0
+
+    def flush(self):
+        """Writes are synchronous, nothing to flush"""
+        pass
+
+    def close(self):
+        pass
+
+
+class SqliteStorage:
+    """SQLite storage: every mutation is committed to the database at once
+
+    SQLite is only a persistence format here. load() reads every row and,
+    as with the JSON backend, filtering and statistics are answered by
+    TransactionManager's in-memory ledger, so the table has no secondary
+    indexes to keep up to date on writes.
+    """
+    _COLUMNS = "id, date, description, amount, type, category"
+
+    def __init__(self, filename="transactions.db", migrate_from="transactions.json"):
+        self._filename = filename
+        # The connection may be opened by a preloading thread and then used
+        # by the Tk thread (never by both at once)
+        _ensure_parent_dir(filename)
+        self._conn = sqlite3.connect(filename, check_same_thread=False)
+        self._create_schema()
+        if migrate_from:
+            self._migrate_from_json(migrate_from)
+
+    @property
+    def filename(self):
+        return self._filename
+
+    def _create_schema(self):
+        """Create the table if it does not exist yet"""
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transactions ("
+                "id INTEGER PRIMARY KEY, date TEXT NOT NULL, description TEXT NOT NULL DEFAULT '', "
+                "amount REAL NOT NULL DEFAULT 0, type TEXT NOT NULL, category TEXT NOT NULL DEFAULT 'Khác')"
+            )
+            # Query indexes created by earlier versions are never used
+            for index in ("idx_transactions_date", "idx_transactions_type_date", "idx_transactions_category"):
+                self._conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+    def _migrate_from_json(self, json_filename):
+        """One-time import of an existing JSON ledger
+
+        The JSON files are renamed (*.migrated) afterwards, so rows deleted
+        from the database later do not come back on the next open. A
+        database that already has rows keeps them and the JSON is only
+        retired.
+        """
+        journal = os.path.splitext(json_filename)[0] + ".journal"
+        if not os.path.exists(json_filename) and not os.path.exists(journal):
+            return
+        if not self._conn.execute("SELECT 1 FROM transactions LIMIT 1").fetchone():
+            self._import_records(JsonStorage(json_filename).load())
+        _retire_json_ledger(json_filename)
+
+    def _import_records(self, records):
+        """Insert records, giving ones that repeat an id a new id"""
+        next_id = max([0] + [int(r.get("id", 1)) for r in records]) + 1
+        seen = set()
+        for record in records:
+            record_id = int(record.get("id", 1))
+            if record_id in seen:
+                record_id = record["id"] = next_id
+                next_id += 1
+            seen.add(record_id)
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO transactions ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._to_row(r) for r in records)
+            )
+
+    @staticmethod
+    def _to_row(data):
+        return (
+            int(data.get("id", 1)),
+            data.get("date", ""),
+            data.get("description", ""),
+            float(data.get("amount", 0.0) or 0.0),
+            data.get("type", "expense"),
+            data.get("category", "Khác")
+        )
+
+    @staticmethod
+    def _to_dict(row):
+        return {
+            "id": row[0],
+            "date": row[1],
+            "description": row[2],
+            "amount": row[3],
+            "type": row[4],
+            "category": row[5]
+        }
+
+    def load(self):
+        """Load every transaction"""
+        cursor = self._conn.execute(f"SELECT {self._COLUMNS} FROM transactions ORDER BY id")
+        return [self._to_dict(row) for row in cursor]
+
+    def append(self, op, data):
+        """Apply a single mutation"""
+        self.append_many([(op, data)])
+
+    def append_many(self, entries):
+        """Apply several (op, data) mutations in one database transaction"""
+        with self._conn:
+            for op, data in entries:
+                if op == "delete":
+                    self._conn.execute("DELETE FROM transactions WHERE id = ?", (int(data["id"]),))
+                else:
+                    self._conn.execute(
+                        f"INSERT OR REPLACE INTO transactions ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                        self._to_row(data)
+                    )
+
+    def needs_compaction(self):
+        """Every mutation is already durable, there is no journal to fold"""
+        return False
+
+    def save_all(self, records):
+        """Replace the whole table with the given records"""
+        with self._conn:
+            self._conn.execute("DELETE FROM transactions")
+            self._conn.executemany(
+                f"INSERT INTO transactions ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._to_row(r) for r in records)
+            )
+
+    def flush(self):
+        """Every mutation is committed immediately, nothing to flush"""
+        pass
+
+    def close(self):
+        self._conn.close()
+
+
+class AsyncStorage:
+    """Write-behind wrapper that runs a storage's writes on a background thread
+
+    append_many() and save_all() only queue work and return immediately.
+    The writer thread coalesces everything queued since its last write into
+    one journal append, and a queued snapshot supersedes journal entries
+    queued before it (snapshots are written to a temp file and renamed).
+    A failed write is only recorded on the writer thread (it never calls
+    back into the GUI): flush() and close() raise it, and a GUI polls for
+    it with take_error().
+    """
+    def __init__(self, storage, coalesce_delay=0.05):
+        self._storage = storage
+        self._coalesce_delay = coalesce_delay
+        self._error = None
+        self._cond = threading.Condition()
+        self._entries = []
+        self._snapshot = None
+        self._binary = None
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def filename(self):
+        return self._storage.filename
+
+    def take_error(self):
+        """The last failed background write (cleared), or None"""
+        with self._cond:
+            error, self._error = self._error, None
+        return error
+
+    def load(self):
+        """Wait for pending writes, then load from the wrapped storage"""
+        self.flush()
+        return self._storage.load()
+
+    def load_binary(self, parse):
+        """Wait for pending writes, then load the wrapped binary snapshot"""
+        self.flush()
+        return self._storage.load_binary(parse)
+
+    def append(self, op, data):
+        self.append_many([(op, data)])
+
+    def append_many(self, entries):
+        """Queue mutations for the writer thread"""
+        with self._cond:
+            self._entries.extend(entries)
+            self._cond.notify()
+
+    def needs_compaction(self):
+        with self._cond:
+            if self._snapshot is not None:
+                return False
+        return self._storage.needs_compaction()
+
+    def save_all(self, records):
+        """Queue a full snapshot; it replaces any journal entries still queued"""
+        with self._cond:
+            self._snapshot = records
+            self._entries = []
+            # A binary snapshot queued earlier is older than this one
+            self._binary = None
+            self._cond.notify()
+
+    def save_binary(self, data):
+        """Queue a binary snapshot, written after any queued JSON snapshot"""
+        with self._cond:
+            self._binary = data
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._has_work() and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._has_work():
+                    return
+                self._busy = True
+            if not self._closed and self._coalesce_delay:
+                # Let a burst of edits pile up so it becomes a single write
+                time.sleep(self._coalesce_delay)
+            with self._cond:
+                snapshot, entries, binary = self._snapshot, self._entries, self._binary
+                self._snapshot, self._entries, self._binary = None, [], None
+            try:
+                if snapshot is not None:
+                    self._storage.save_all(snapshot)
+                if entries:
+                    self._storage.append_many(entries)
+                if binary is not None:
+                    self._storage.save_binary(binary)
+            except Exception as e:
+                with self._cond:
+                    self._error = e
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _has_work(self):
+        return bool(self._entries) or self._snapshot is not None or self._binary is not None
+
+    def flush(self, timeout=None):
+        """Block until every queued write has reached the disk
+
+        Raises the last write error not yet taken with take_error().
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._has_work() or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        error = self.take_error()
+        if error is not None:
+            raise error
+        return True
+
+    def close(self):
+        """Flush pending writes and stop the writer thread
+
+        The writer is stopped even when a write failed; the error is raised
+        afterwards.
+        """
+        if self._closed:
+            return
+        # Closed instances must not be kept alive by the exit hook
+        atexit.unregister(self.close)
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join()
+            self._storage.close()
+
+
+# Per-user partitions live in USER_DATA_DIR/<user>/; the files of the
+# former shared ledger are renamed with this suffix once migrated
+USER_DATA_DIR = "user_data"
+LEGACY_TRANSACTIONS = "transactions.json"
+LEGACY_DATABASE = "transactions.db"
+MIGRATED_SUFFIX = ".migrated"
+
+
+def user_data_dir(username, root=USER_DATA_DIR):
+    """Directory holding one user's transactions
+
+    Usernames are sanitized into a file name; a short hash keeps names
+    that needed changes (or differ only by case) apart.
+    """
+    name = str(username)
+    safe = re.sub(r"[^\w-]", "_", name)
+    if safe != name or safe.lower() != safe:
+        safe += "_" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(root, safe)
+
+
+def _partition_has_data(directory):
+    """Whether a user's partition already holds transactions
+
+    Opening a storage does not write anything except SQLite's (empty)
+    schema, so only a JSON snapshot or journal (also one already imported
+    into SQLite), or a database with rows, counts as data.
+    """
+    if any(os.path.exists(os.path.join(directory, name))
+           for name in ("transactions.json", "transactions.journal", "transactions.json" + MIGRATED_SUFFIX)):
+        return True
+    database = os.path.join(directory, "transactions.db")
+    if not os.path.exists(database):
+        return False
+    conn = sqlite3.connect(database)
+    try:
+        return conn.execute("SELECT 1 FROM transactions LIMIT 1").fetchone() is not None
+    except sqlite3.DatabaseError:
+        # Not a ledger we created; leave it alone
+        return True
+    finally:
+        conn.close()
+
+
+def migrate_shared_transactions(usernames, legacy_filename=LEGACY_TRANSACTIONS,
+                                legacy_database=LEGACY_DATABASE, root=USER_DATA_DIR):
+    """One-time split of the former shared ledger into per-user partitions
+
+    Legacy transactions carry no owner, so every existing user whose
+    partition holds no transactions yet (an empty directory does not
+    count) is seeded with a copy of them; the legacy files are then
+    renamed (*.migrated) so later accounts start empty. Returns the
+    number of partitions seeded.
+    """
+    journal = os.path.splitext(legacy_filename)[0] + ".journal"
+    has_json = os.path.exists(legacy_filename) or os.path.exists(journal)
+    has_database = os.path.exists(legacy_database)
+    if not has_json and not has_database:
+        return 0
+
+    records = JsonStorage(legacy_filename).load() if has_json else None
+    created = 0
+    for username in usernames:
+        directory = user_data_dir(username, root)
+        if _partition_has_data(directory):
+            continue
+        os.makedirs(directory, exist_ok=True)
+        if records is not None:
+            JsonStorage(os.path.join(directory, "transactions.json")).save_all(records)
+        if has_database:
+            shutil.copyfile(legacy_database, os.path.join(directory, "transactions.db"))
+        created += 1
+
+    _retire_json_ledger(legacy_filename)
+    if has_database:
+        os.replace(legacy_database, legacy_database + MIGRATED_SUFFIX)
+    return created
+
+
+def create_storage(backend=None, async_writes=None, username=None):
+    """Create the storage backend selected by QLCT_STORAGE ("json" or "sqlite")
+
+    With a username only that user's partition (see user_data_dir) is
+    used, otherwise the shared files in the working directory. The
+    partition's directory is created by the first write, not here.
+    JSON writes go through a background writer unless QLCT_ASYNC_SAVE=0
+    (SQLite connections are bound to the thread that opened them), and a
+    binary snapshot is kept next to the JSON unless QLCT_BINARY_SNAPSHOT=0.
+    """
+    directory = ""
+    if username is not None:
+        directory = user_data_dir(username)
+    json_filename = os.path.join(directory, "transactions.json")
+    backend = backend or os.environ.get("QLCT_STORAGE", "json")
+    if backend == "sqlite":
+        return SqliteStorage(os.path.join(directory, "transactions.db"), migrate_from=json_filename)
+    if async_writes is None:
+        async_writes = os.environ.get("QLCT_ASYNC_SAVE", "1") != "0"
+    binary_snapshot = os.environ.get("QLCT_BINARY_SNAPSHOT", "1") != "0"
+    storage = JsonStorage(json_filename, binary_snapshot=binary_snapshot)
+    return AsyncStorage(storage) if async_writes else storage
@@ -1,11 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import json
-import os
 import csv
 from datetime import datetime
 from tkcalendar import DateEntry
 from abc import ABC, abstractmethod
+from UserStore import get_user_store
+from Profiling import timed
 
 class BaseView(ABC):
     """Abstract base class for all views"""
@@ -33,8 +34,9 @@ class UserInfoView(BaseView):
         super().__init__(parent)
         self.controller = controller
         self.username = username
-        self.users_file = "users.json"
-        self.users = self.load_users()
+        self.users = get_user_store()
+        if self.users.error is not None:
+            messagebox.showerror("Lỗi", f"Không thể đọc dữ liệu người dùng: {str(self.users.error)}")
         
         # Các trường thông tin
         self.name_var = tk.StringVar()
@@ -52,27 +54,6 @@ class UserInfoView(BaseView):
         # Load thông tin người dùng
         self.update_view()
 
-    def load_users(self):
-        """Tải dữ liệu người dùng từ file users.json"""
-        if os.path.exists(self.users_file):
-            try:
-                with open(self.users_file, "r", encoding="utf-8") as file:
-                    return json.load(file)
-            except Exception as e:
-                messagebox.showerror("Lỗi", f"Không thể đọc dữ liệu người dùng: {str(e)}")
-                return {}
-        return {}
-
-    def save_users(self):
-        """Lưu dữ liệu người dùng vào file users.json"""
-        try:
-            with open(self.users_file, "w", encoding="utf-8") as file:
-                json.dump(self.users, file, indent=4, ensure_ascii=False)
-            return True
-        except Exception as e:
-            messagebox.showerror("Lỗi", f"Không thể lưu dữ liệu người dùng: {str(e)}")
-            return False
-
     def setup_ui(self):
         """Thiết lập giao diện người dùng"""
         frame = ttk.LabelFrame(self._frame, text="Thông Tin Cá Nhân")
@@ -107,15 +88,17 @@ class UserInfoView(BaseView):
         ttk.Button(button_frame, text="Xuất CSV", command=self.export_csv).pack(side="left", padx=5)
         ttk.Button(button_frame, text="Xuất JSON", command=self.export_json).pack(side="left", padx=5)
 
+    @timed("UserInfoView.update_view")
     def update_view(self, data=None):
         """Cập nhật thông tin người dùng lên giao diện"""
-        user_data = self.users.get(self.username, {})
+        user_data = (self.users.get(self.username) or {})
         self.name_var.set(user_data.get("name", ""))
         self.dob_var.set(user_data.get("dob", datetime.now().strftime("%Y-%m-%d")))
         self.email_var.set(user_data.get("email", ""))
         self.phone_var.set(user_data.get("phone", ""))
         self.role_var.set(user_data.get("role", self.roles[0]))
 
+    @timed("UserInfoView.save_changes")
     def save_changes(self):
         """Lưu thay đổi thông tin người dùng"""
         try:
@@ -142,22 +125,24 @@ class UserInfoView(BaseView):
             if role not in self.roles:
                 raise ValueError("Đối tượng không hợp lệ")
 
-            # Cập nhật thông tin người dùng
-            self.users[self.username] = {
-                "password": self.users.get(self.username, {}).get("password", ""),
-                "name": name,
-                "dob": dob,
-                "email": email,
-                "phone": phone,
-                "role": role
-            }
-
-            # Lưu vào file
-            if self.save_users():
-                messagebox.showinfo("Thành công", "Thông tin đã được cập nhật!")
-                self.update_view()
-            else:
-                messagebox.showerror("Lỗi", "Không thể lưu thông tin")
+            # Cập nhật thông tin người dùng và lưu vào file
+            try:
+                if self.username in self.users:
+                    self.users.update(self.username, name=name, dob=dob, email=email, phone=phone, role=role)
+                else:
+                    self.users.add(self.username, {
+                        "password": "",
+                        "name": name,
+                        "dob": dob,
+                        "email": email,
+                        "phone": phone,
+                        "role": role
+                    })
+            except OSError as e:
+                messagebox.showerror("Lỗi", f"Không thể lưu thông tin: {str(e)}")
+                return
+            messagebox.showinfo("Thành công", "Thông tin đã được cập nhật!")
+            self.update_view()
         except ValueError as e:
             messagebox.showwarning("Lỗi", str(e))
         except Exception as e:
@@ -174,7 +159,7 @@ class UserInfoView(BaseView):
             if not filename:
                 return
 
-            user_data = self.users.get(self.username, {})
+            user_data = (self.users.get(self.username) or {})
             with open(filename, 'w', newline='', encoding='utf-8') as file:
                 writer = csv.writer(file)
                 writer.writerow(["Tên đăng nhập", "Tên", "Ngày sinh", "Email", "Số điện thoại", "Đối tượng"])
@@ -201,7 +186,7 @@ class UserInfoView(BaseView):
             if not filename:
                 return
 
-            user_data = self.users.get(self.username, {})
+            user_data = (self.users.get(self.username) or {})
             export_data = {
                 "username": self.username,
                 "name": user_data.get("name", ""),
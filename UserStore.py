@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+
+# Single shared repository for users.json. Login and the profile tab use the
+# same instance, so there is one in-memory copy of the accounts, kept in hash
+# indexes on username, email and phone and written back atomically.
+
+USERS_FILE = "users.json"
+INDEXED_FIELDS = ("email", "phone")
+
+
+class UserStore:
+    """Accounts from users.json with indexes on username, email and phone
+
+    Records are the dictionaries stored in users.json ("password", "name",
+    "dob", "email", "phone", "role"). Every mutation is written to disk
+    immediately (temporary file + rename) and rolled back in memory if the
+    write fails. The file is reloaded when another process has changed it.
+    If it cannot be read, the store starts empty and `error` is set.
+    """
+    def __init__(self, filename=USERS_FILE):
+        self._filename = filename
+        self._lock = threading.RLock()
+        self._users = {}
+        # email / phone -> usernames using it, in registration order
+        self._by_email = {}
+        self._by_phone = {}
+        self._stamp = None
+        self.error = None
+        try:
+            self.reload()
+        except (OSError, ValueError) as e:
+            self.error = e
+
+    @property
+    def filename(self):
+        return self._filename
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self._filename)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self):
+        """Re-read users.json and rebuild the indexes
+
+        A missing file means no accounts; an unreadable one raises (the
+        in-memory accounts are left empty).
+        """
+        with self._lock:
+            self._users, self._by_email, self._by_phone = {}, {}, {}
+            self._stamp = self._file_stamp()
+            if self._stamp is None:
+                return
+            with open(self._filename, "r", encoding="utf-8") as file:
+                users = json.load(file)
+            if not isinstance(users, dict):
+                raise ValueError("users.json phải là một đối tượng JSON")
+            self._users = users
+            self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        self._by_email, self._by_phone = {}, {}
+        for username, record in self._users.items():
+            self._index(username, record)
+
+    def _refresh(self):
+        """Reload when users.json changed behind our back"""
+        if self._file_stamp() != self._stamp:
+            try:
+                self.reload()
+                self.error = None
+            except (OSError, ValueError) as e:
+                self.error = e
+
+    def _field_indexes(self, fields):
+        indexes = {"email": self._by_email, "phone": self._by_phone}
+        return [(indexes[field], field) for field in fields]
+
+    def _index(self, username, record, fields=INDEXED_FIELDS):
+        for index, field in self._field_indexes(fields):
+            value = record.get(field)
+            if value:
+                index.setdefault(value, {})[username] = None
+
+    def _unindex(self, username, record, fields=INDEXED_FIELDS):
+        for index, field in self._field_indexes(fields):
+            owners = index.get(record.get(field))
+            if owners is not None:
+                owners.pop(username, None)
+                if not owners:
+                    del index[record.get(field)]
+
+    def _save(self):
+        tmp_filename = self._filename + ".tmp"
+        with open(tmp_filename, "w", encoding="utf-8") as file:
+            json.dump(self._users, file, indent=4, ensure_ascii=False)
+        os.replace(tmp_filename, self._filename)
+        self._stamp = self._file_stamp()
+
+    def _put(self, username, record):
+        """Replace (or with None remove) one account and write the file
+
+        An updated account keeps its place in the file and in the
+        email/phone indexes; only the index entries of changed fields move.
+        """
+        with self._lock:
+            before = dict(self._users)
+            old = self._users.get(username)
+            if record is None:
+                if old is not None:
+                    self._unindex(username, old)
+                    del self._users[username]
+            elif old is None:
+                self._users[username] = record
+                self._index(username, record)
+            else:
+                self._users[username] = record
+                changed = [field for field in INDEXED_FIELDS if old.get(field) != record.get(field)]
+                self._unindex(username, old, changed)
+                self._index(username, record, changed)
+            try:
+                self._save()
+            except Exception:
+                self._users = before
+                self._rebuild_indexes()
+                raise
+
+    def __contains__(self, username):
+        with self._lock:
+            self._refresh()
+            return username in self._users
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._users)
+
+    def usernames(self):
+        with self._lock:
+            self._refresh()
+            return list(self._users)
+
+    def get(self, username):
+        """A copy of the account record, or None"""
+        with self._lock:
+            self._refresh()
+            record = self._users.get(username)
+            return dict(record) if record is not None else None
+
+    def find_by_email(self, email):
+        """Username registered (first) with this email, or None"""
+        with self._lock:
+            self._refresh()
+            return next(iter(self._by_email.get(email, ())), None)
+
+    def find_by_phone(self, phone):
+        """Username registered (first) with this phone number, or None"""
+        with self._lock:
+            self._refresh()
+            return next(iter(self._by_phone.get(phone, ())), None)
+
+    def add(self, username, record):
+        """Register a new account; raises ValueError if the name is taken"""
+        with self._lock:
+            self._refresh()
+            if username in self._users:
+                raise ValueError("Tên người dùng đã tồn tại!")
+            self._put(username, dict(record))
+
+    def update(self, username, **fields):
+        """Change some fields of an existing account"""
+        with self._lock:
+            self._refresh()
+            if username not in self._users:
+                raise KeyError(username)
+            record = dict(self._users[username])
+            record.update(fields)
+            self._put(username, record)
+
+    def remove(self, username):
+        with self._lock:
+            self._refresh()
+            if username in self._users:
+                self._put(username, None)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_user_store(filename=USERS_FILE):
+    """The shared UserStore for filename (created on first use)"""
+    key = os.path.abspath(filename)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = UserStore(filename)
+        return store
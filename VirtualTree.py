@@ -0,0 +1,217 @@
+import tkinter as tk
+
+# Virtual scrolling for the transaction lists. Only needs tkinter (no
+# tkcalendar or matplotlib), so benchmarks can drive it without the GUI.
+
+def transaction_row_values(t):
+    """Treeview column values for a transaction"""
+    return (
+        t.id,
+        t.date,
+        t.description,
+        f"{t.amount:,.0f} VND",
+        t.get_display_type(),
+        t.category
+    )
+
+class VirtualTreeview:
+    """Virtual scrolling for a ttk.Treeview
+    
+    Only the rows visible in the viewport exist as Treeview items; they are
+    reused and refilled from `rows` (any sequence supporting len() and
+    indexing) as the scrollbar, mouse wheel or keyboard moves the window.
+    """
+    def __init__(self, tree, scrollbar, format_row):
+        self._tree = tree
+        self._scrollbar = scrollbar
+        self._format_row = format_row
+        self._rows = []
+        self._offset = 0
+        self._visible = 20
+        self._row_height = 20
+        self._selected_id = None
+        self._visible_ids = []
+        
+        self._scrollbar.config(command=self.yview)
+        self._tree.bind("<Configure>", self._on_configure)
+        self._tree.bind("<<TreeviewSelect>>", self._on_select)
+        self._tree.bind("<MouseWheel>", self._on_mousewheel)
+        self._tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self._tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self._tree.bind("<Down>", lambda e: self._on_arrow(1))
+        self._tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self._tree.bind("<Next>", lambda e: self._scroll_by(self._visible) or "break")
+        self._tree.bind("<Prior>", lambda e: self._scroll_by(-self._visible) or "break")
+    
+    @property
+    def rows(self):
+        return self._rows
+    
+    def set_rows(self, rows, reset=True):
+        """Replace the row source; unless reset, the first visible row stays on top"""
+        anchor_id = self._visible_ids[0] if not reset and self._offset > 0 and self._visible_ids else None
+        self._rows = rows
+        if reset:
+            self._offset = 0
+        elif anchor_id is not None:
+            position = self._position_of(anchor_id)
+            if position is not None:
+                self._offset = position
+        self.refresh()
+    
+    def selected_id(self):
+        """ID of the selected row, even if it is scrolled out of view"""
+        return self._selected_id
+    
+    def apply_change(self, kind, transaction_id, transaction=None):
+        """Apply a single add/update/delete without rebuilding the list
+        
+        Live row sources (with position_of) already contain the change; plain
+        lists are patched here (updates and deletes only, since a list does
+        not know which new rows belong to it). The first visible row is kept
+        in place so the scroll position and selection survive.
+        """
+        live = hasattr(self._rows, "position_of")
+        if not live and not self._patch_list(kind, transaction_id, transaction):
+            return
+        if kind == "delete" and transaction_id == self._selected_id:
+            self._selected_id = None
+        
+        # Edit of a visible row that did not move: update just that item
+        if kind == "update" and transaction_id in self._visible_ids:
+            index = self._visible_ids.index(transaction_id)
+            position = self._position_of(transaction_id)
+            if position == self._offset + index:
+                self._tree.item(str(index), values=self._format_row(self._rows[position]))
+                return
+        
+        # Otherwise keep the first visible row anchored and refill the window
+        if self._offset > 0 and self._visible_ids:
+            anchor = self._position_of(self._visible_ids[0])
+            if anchor is not None:
+                self._offset = anchor
+        self.refresh()
+    
+    def _position_of(self, transaction_id):
+        if hasattr(self._rows, "position_of"):
+            return self._rows.position_of(transaction_id)
+        for i, t in enumerate(self._rows):
+            if t.id == transaction_id:
+                return i
+        return None
+    
+    def _patch_list(self, kind, transaction_id, transaction):
+        """Patch a plain newest-first list; returns whether it changed"""
+        index = self._position_of(transaction_id)
+        if index is None:
+            return False
+        if kind == "delete":
+            del self._rows[index]
+        elif kind == "update" and transaction is not None:
+            if self._rows[index].date == transaction.date:
+                self._rows[index] = transaction
+            else:
+                del self._rows[index]
+                position = next((i for i, t in enumerate(self._rows) if t.date < transaction.date), len(self._rows))
+                self._rows.insert(position, transaction)
+        else:
+            return False
+        return True
+    
+    def _max_offset(self):
+        return max(0, len(self._rows) - self._visible)
+    
+    def refresh(self):
+        """Refill the visible items from the row source"""
+        self._offset = min(max(0, self._offset), self._max_offset())
+        count = max(0, min(self._visible, len(self._rows) - self._offset))
+        items = self._tree.get_children()
+        
+        # Grow or shrink the pool of reusable items
+        for i in range(len(items), count):
+            self._tree.insert("", tk.END, iid=str(i))
+        for iid in items[count:]:
+            self._tree.delete(iid)
+        
+        self._visible_ids = []
+        selected_iid = None
+        for i in range(count):
+            t = self._rows[self._offset + i]
+            self._tree.item(str(i), values=self._format_row(t))
+            self._visible_ids.append(t.id)
+            if t.id == self._selected_id:
+                selected_iid = str(i)
+        
+        if selected_iid is not None:
+            self._tree.selection_set(selected_iid)
+        elif self._tree.selection():
+            self._tree.selection_set(())
+        
+        total = len(self._rows)
+        if total:
+            self._scrollbar.set(self._offset / total, (self._offset + count) / total)
+        else:
+            self._scrollbar.set(0, 1)
+    
+    def yview(self, *args):
+        """Scrollbar command ("moveto" fraction | "scroll" n units/pages)"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._offset = int(float(args[1]) * len(self._rows))
+            self.refresh()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= self._visible
+            self._scroll_by(step)
+    
+    def _scroll_by(self, step):
+        offset = min(max(0, self._offset + step), self._max_offset())
+        if offset != self._offset:
+            self._offset = offset
+            self.refresh()
+    
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        self._scroll_by(step * 3)
+        return "break"
+    
+    def _on_arrow(self, direction):
+        """Scroll instead of stopping when the selection is at the viewport edge"""
+        selection = self._tree.selection()
+        if not selection or not self._visible_ids:
+            return None
+        index = self._tree.index(selection[0])
+        at_edge = (index == len(self._visible_ids) - 1) if direction > 0 else (index == 0)
+        if not at_edge:
+            return None
+        position = self._offset + index + direction
+        if 0 <= position < len(self._rows):
+            self._selected_id = self._rows[position].id
+            self._scroll_by(direction)
+        return "break"
+    
+    def _on_select(self, event=None):
+        selection = self._tree.selection()
+        if selection:
+            index = self._tree.index(selection[0])
+            if index < len(self._visible_ids):
+                self._selected_id = self._visible_ids[index]
+        elif self._selected_id in self._visible_ids:
+            # The user cleared a visible selection
+            self._selected_id = None
+    
+    def _on_configure(self, event):
+        """Recompute how many rows fit when the widget is resized"""
+        items = self._tree.get_children()
+        header = 0
+        if items:
+            bbox = self._tree.bbox(items[0])
+            if bbox:
+                header, self._row_height = bbox[1], bbox[3]
+        visible = max(1, (event.height - header) // max(1, self._row_height))
+        if visible != self._visible:
+            self._visible = visible
+            self.refresh()
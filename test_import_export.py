@@ -0,0 +1,39 @@
+import io
+import unittest
+from ImportExport import iter_csv_records, normalize_record
+
+# Parsing of imported CSV/JSON records. Run with: python -m unittest test_import_export
+
+
+class NormalizeRecordTest(unittest.TestCase):
+    def test_amount_formats(self):
+        for raw, expected in (("20000", 20000.0), ("20,000", 20000.0), ("20.000 VND", 20000.0),
+                              ("1.234,50", 1234.5), (15000, 15000.0)):
+            self.assertEqual(normalize_record({"date": "2024-01-01", "amount": raw})["amount"], expected)
+
+    def test_sign_sets_missing_type(self):
+        self.assertEqual(normalize_record({"date": "2024-01-01", "amount": "-15000"})["type"], "expense")
+        self.assertEqual(normalize_record({"date": "2024-01-01", "amount": "15000"})["type"], "income")
+        record = normalize_record({"Ngày": "05/01/2024", "Số tiền": "-15000", "Loại": "Thu nhập"})
+        self.assertEqual((record["date"], record["amount"], record["type"]), ("2024-01-05", 15000.0, "income"))
+
+    def test_zero_and_non_finite_amounts_are_rejected(self):
+        for amount in ("0", "nan", "NaN", "inf", "-inf", float("nan"), float("inf")):
+            with self.assertRaises(ValueError):
+                normalize_record({"date": "2024-01-01", "amount": amount})
+
+    def test_missing_or_invalid_fields_are_rejected(self):
+        for raw in ({"date": "2024-01-01"}, {"amount": "1000"}, {"date": "hôm qua", "amount": "1000"}):
+            with self.assertRaises(ValueError):
+                normalize_record(raw)
+
+    def test_csv_rows(self):
+        data = "﻿Ngày,Mô tả,Số tiền\n2024-01-01,Cơm trưa,-45000\n2024-01-02,,nan\n".encode("utf-8")
+        rows = list(iter_csv_records(io.BytesIO(data)))
+        self.assertEqual(normalize_record(rows[0])["description"], "Cơm trưa")
+        with self.assertRaises(ValueError):
+            normalize_record(rows[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
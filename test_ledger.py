@@ -0,0 +1,73 @@
+import random
+import unittest
+from Ledger import ColumnarLedger, TYPE_EXPENSE, TYPE_INCOME
+
+# Randomized checks of ColumnarLedger against a plain dict model.
+# Run with: python -m unittest test_ledger
+
+
+class ColumnarLedgerTest(unittest.TestCase):
+    FIRST_DAY = 738000
+
+    def _random_row(self, rng, transaction_id):
+        return (transaction_id, self.FIRST_DAY + rng.randint(0, 60), float(rng.randint(1, 500) * 1000),
+                rng.choice((TYPE_EXPENSE, TYPE_INCOME)), rng.choice(("Ăn uống", "Đi lại", "Khác")),
+                rng.choice(("Cơm trưa", "Xe bus", "Lương")))
+
+    def _assert_matches(self, ledger, model):
+        self.assertEqual(len(ledger), len(model))
+        for transaction_id, row in model.items():
+            self.assertIn(transaction_id, ledger)
+            view = ledger.get(transaction_id)
+            self.assertEqual((view.id, view.amount, view.category, view.description),
+                             (row[0], row[2], row[4], row[5]))
+        expected_order = sorted((row[1], row[0]) for row in model.values())
+        self.assertEqual(list(ledger.select_ids()), [i for _, i in expected_order])
+        self.assertEqual(sorted(t.id for t in ledger), sorted(model))
+        self.assertEqual(ledger.max_id(), max(model, default=0))
+
+    def _random_ids(self, rng):
+        """Mostly sequential ids with negative, zero and very sparse ones mixed in"""
+        return rng.choice((
+            lambda: rng.randint(1, 300),
+            lambda: rng.randint(-50, 0),
+            lambda: rng.randint(10 ** 6, 10 ** 9),
+            lambda: rng.randint(300, 5000)
+        ))()
+
+    def test_random_operations_match_dict_model(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            ledger, model = ColumnarLedger(), {}
+            for _ in range(600):
+                transaction_id = self._random_ids(rng)
+                row = self._random_row(rng, transaction_id)
+                action = rng.random()
+                if transaction_id not in model and action < 0.6:
+                    ledger.append(*row)
+                    model[transaction_id] = row
+                elif transaction_id in model and action < 0.8:
+                    self.assertTrue(ledger.update(*row))
+                    model[transaction_id] = row
+                elif transaction_id in model:
+                    self.assertEqual(ledger.remove(transaction_id).id, transaction_id)
+                    del model[transaction_id]
+                else:
+                    self.assertIsNone(ledger.remove(transaction_id))
+                    self.assertIsNone(ledger.get(transaction_id))
+            self._assert_matches(ledger, model)
+            self._assert_matches(ColumnarLedger.from_snapshot(ledger.to_snapshot()), model)
+
+    def test_bulk_load_with_negative_and_sparse_ids(self):
+        rng = random.Random(1)
+        for ids in ([-1, 1, 2], [-13, 0, 5, 3000, 7], [2 ** 40, -2, 1]):
+            ledger = ColumnarLedger()
+            rows = [self._random_row(rng, i) for i in ids]
+            ledger.extend(rows)
+            model = {row[0]: row for row in rows}
+            self._assert_matches(ledger, model)
+            self._assert_matches(ColumnarLedger.from_snapshot(ledger.to_snapshot()), model)
+
+
+if __name__ == "__main__":
+    unittest.main()
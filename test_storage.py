@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import unittest
+from Core import TransactionManager, TransactionModel
+from Ledger import ColumnarLedger
+from Storage import JsonStorage, SqliteStorage, migrate_shared_transactions, user_data_dir
+
+# Round trips through the storage backends, the binary snapshot and the
+# shared-ledger migration. Run with: python -m unittest test_storage
+
+
+def record(transaction_id, day=1, amount=1000.0, type_name="expense", description="Cơm trưa"):
+    return {"id": transaction_id, "date": f"2024-01-{day:02d}", "description": description,
+            "amount": amount, "type": type_name, "category": "Ăn uống"}
+
+
+def write_json(filename, records):
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(records, file, ensure_ascii=False)
+
+
+class StorageTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def path(self, *names):
+        return os.path.join(self.dir, *names)
+
+    def assertLedger(self, manager, expected):
+        """The manager holds exactly the expected {id: amount}"""
+        self.assertEqual({t.id: t.amount for t in manager.transactions}, expected)
+        self.assertEqual(manager.get_summary()["count"], len(expected))
+
+
+class JsonStorageTest(StorageTestCase):
+    def test_journal_replay(self):
+        storage = JsonStorage(self.path("l.json"))
+        storage.save_all([record(1), record(2)])
+        storage.append_many([("add", record(3)), ("update", record(1, amount=5.0)), ("delete", {"id": 2})])
+        loaded = {r["id"]: r["amount"] for r in JsonStorage(self.path("l.json")).load()}
+        self.assertEqual(loaded, {1: 5.0, 3: 1000.0})
+
+    def test_truncated_journal_line_is_ignored(self):
+        storage = JsonStorage(self.path("l.json"))
+        storage.append("add", record(1))
+        with open(storage.journal_filename, "a", encoding="utf-8") as file:
+            file.write('{"op": "add", "data": {"id": 2')
+        self.assertEqual([r["id"] for r in JsonStorage(self.path("l.json")).load()], [1])
+
+    def test_compaction_then_binary_load(self):
+        manager = TransactionManager(storage=JsonStorage(self.path("l.json"), compact_threshold=3), load=False)
+        for i in range(1, 8):
+            manager.add_transaction(TransactionModel.from_dict(record(i, day=i)))
+        manager.delete_transaction(4)
+        # Journaled after the last snapshot, replayed on top of the binary load
+        manager.update_transaction(TransactionModel.from_dict(record(2, amount=7.0)))
+        manager.close()
+
+        storage = JsonStorage(self.path("l.json"))
+        self.assertIsNotNone(storage.load_binary(ColumnarLedger.from_snapshot))
+        expected = {1: 1000.0, 2: 7.0, 3: 1000.0, 5: 1000.0, 6: 1000.0, 7: 1000.0}
+        self.assertLedger(TransactionManager(storage=JsonStorage(self.path("l.json"))), expected)
+        self.assertLedger(TransactionManager(storage=JsonStorage(self.path("l.json"), binary_snapshot=False)),
+                          expected)
+
+    def test_repeated_ids_are_renumbered_not_dropped(self):
+        write_json(self.path("l.json"), [record(1), record(2, amount=2.0), record(2, amount=3.0)])
+        manager = TransactionManager(storage=JsonStorage(self.path("l.json")))
+        self.assertLedger(manager, {1: 1000.0, 2: 2.0, 3: 3.0})
+        self.assertLedger(TransactionManager(storage=JsonStorage(self.path("l.json"))), {1: 1000.0, 2: 2.0, 3: 3.0})
+
+    def test_read_only_manager_leaves_files_untouched(self):
+        write_json(self.path("l.json"), [record(1), record(1)])
+        with open(self.path("l.json"), "rb") as file:
+            before = file.read()
+        manager = TransactionManager(storage=JsonStorage(self.path("l.json")), read_only=True)
+        self.assertEqual(manager.get_summary()["count"], 2)
+        with open(self.path("l.json"), "rb") as file:
+            self.assertEqual(file.read(), before)
+        self.assertEqual(sorted(os.listdir(self.dir)), ["l.json"])
+
+
+class SqliteStorageTest(StorageTestCase):
+    def open(self):
+        return SqliteStorage(self.path("t.db"), migrate_from=self.path("t.json"))
+
+    def test_json_is_imported_once(self):
+        write_json(self.path("t.json"), [record(1), record(1, amount=2.0)])
+        manager = TransactionManager(storage=self.open())
+        self.assertLedger(manager, {1: 1000.0, 2: 2.0})
+        self.assertTrue(os.path.exists(self.path("t.json.migrated")))
+
+        manager.delete_transaction(1)
+        manager.delete_transaction(2)
+        manager.close()
+        manager = TransactionManager(storage=self.open())
+        self.assertLedger(manager, {})
+        manager.close()
+
+
+class SharedLedgerMigrationTest(StorageTestCase):
+    def test_partitions_without_data_are_seeded(self):
+        legacy = self.path("transactions.json")
+        write_json(legacy, [record(1), record(2)])
+        root = self.path("user_data")
+        # An empty directory (e.g. opened before the split) is not data
+        os.makedirs(user_data_dir("alice", root))
+        # A partition that already has transactions is left alone
+        os.makedirs(user_data_dir("bob", root))
+        JsonStorage(os.path.join(user_data_dir("bob", root), "transactions.json")).save_all([record(9)])
+
+        created = migrate_shared_transactions(["alice", "bob", "Carol"], legacy_filename=legacy,
+                                              legacy_database=self.path("transactions.db"), root=root)
+        self.assertEqual(created, 2)
+        for username, ids in (("alice", [1, 2]), ("bob", [9]), ("Carol", [1, 2])):
+            storage = JsonStorage(os.path.join(user_data_dir(username, root), "transactions.json"))
+            self.assertEqual(sorted(r["id"] for r in storage.load()), ids)
+        self.assertFalse(os.path.exists(legacy))
+        self.assertTrue(os.path.exists(legacy + ".migrated"))
+        # Nothing left to split
+        self.assertEqual(migrate_shared_transactions(["dave"], legacy_filename=legacy, root=root), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()